@@ -16,7 +16,7 @@ from __future__ import unicode_literals
 """Core locale representation and locale data access."""
 
 import os
-from babel.compat import pickle, string_types
+from babel.compat import pickle, string_types, threading
 
 from babel import localedata
 
@@ -25,12 +25,22 @@ __all__ = ['UnknownLocaleError', 'Locale', 'default_locale', 'negotiate_locale',
 __docformat__ = 'restructuredtext en'
 
 _global_data = None
+_global_lock = threading.Lock()
+
+#: Interned `Locale` instances, the results of `Locale.parse`, and the
+#: identifiers known to have no locale data
+_locales = {}
+_parsed_locales = {}
+_unknown_locales = set()
+_LOCALE_CACHE_SIZE = 1000
 
 def get_global(key):
     """Return the dictionary for the given key in the global data.
 
     The global data is stored in the ``babel/global.dat`` file and contains
-    information independent of individual locales.
+    information independent of individual locales. If the file is in the
+    sectioned format written by ``import_cldr.py``, every key is only read
+    from it when it is first requested.
 
     >>> get_global('zone_aliases')['UTC'] == 'Etc/GMT'
     True
@@ -44,15 +54,28 @@ def get_global(key):
     """
     global _global_data
     if _global_data is None:
-        dirname = os.path.join(os.path.dirname(__file__))
-        filename = os.path.join(dirname, 'global.dat')
-        fileobj = open(filename, 'rb')
+        _global_lock.acquire()
         try:
-            _global_data = pickle.load(fileobj)
+            if _global_data is None:
+                _global_data = _read_global()
         finally:
-            fileobj.close()
+            _global_lock.release()
     return _global_data.get(key, {})
 
+def _read_global():
+    dirname = os.path.join(os.path.dirname(__file__))
+    filename = os.path.join(dirname, 'global.dat')
+    try:
+        return localedata.SectionedLocaleData(filename)
+    except IOError:
+        # not sectioned, written by an older version of import_cldr.py
+        pass
+    fileobj = open(filename, 'rb')
+    try:
+        return pickle.load(fileobj)
+    finally:
+        fileobj.close()
+
 
 LOCALE_ALIASES = {
     'ar': 'ar_SY', 'bg': 'bg_BG', 'bs': 'bs_BA', 'ca': 'ca_ES', 'cs': 'cs_CZ',
@@ -114,6 +137,27 @@ class Locale(object):
     :see: `IETF RFC 3066 <http://www.ietf.org/rfc/rfc3066.txt>`_
     """
 
+    def __new__(cls, language, territory=None, script=None, variant=None):
+        key = (cls, language, territory, script, variant)
+        try:
+            return _locales[key]
+        except KeyError:
+            pass
+        self = object.__new__(cls)
+        object.__setattr__(self, 'language', language)
+        object.__setattr__(self, 'territory', territory)
+        object.__setattr__(self, 'script', script)
+        object.__setattr__(self, 'variant', variant)
+        identifier = self._identifier = str(self)
+        self._loaded = (None, None)
+        if identifier in _unknown_locales or \
+                not localedata.exists(identifier):
+            if len(_unknown_locales) >= _LOCALE_CACHE_SIZE:
+                _unknown_locales.clear()
+            _unknown_locales.add(identifier)
+            raise UnknownLocaleError(identifier)
+        return _locales.setdefault(key, self)
+
     def __init__(self, language, territory=None, script=None, variant=None):
         """Initialize the locale object from the given identifier components.
 
@@ -123,6 +167,16 @@ class Locale(object):
         >>> locale.territory == 'US'
         True
 
+        `Locale` objects are immutable, and creating a locale that was already
+        created before returns the same object:
+
+        >>> Locale('en', 'US') is locale
+        True
+        >>> locale.territory = 'GB'
+        Traceback (most recent call last):
+          ...
+        AttributeError: Locale objects are immutable
+
         :param language: the language code
         :param territory: the territory (country or region) code
         :param script: the script code
@@ -130,15 +184,17 @@ class Locale(object):
         :raise `UnknownLocaleError`: if no locale data is available for the
                                      requested locale
         """
-        self.language = language
-        self.territory = territory
-        self.script = script
-        self.variant = variant
-        self.__data = None
-
-        identifier = str(self)
-        if not localedata.exists(identifier):
-            raise UnknownLocaleError(identifier)
+        # The instance has already been set up (or reused) by `__new__`
+
+    def __setattr__(self, name, value):
+        if name in ('language', 'territory', 'script', 'variant'):
+            raise AttributeError('%s objects are immutable' %
+                                 type(self).__name__)
+        object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        return (type(self), (self.language, self.territory, self.script,
+                             self.variant))
 
     @classmethod
     def default(cls, category=None, aliases=LOCALE_ALIASES):
@@ -204,6 +260,12 @@ class Locale(object):
         >>> Locale.parse(l)
         Locale('de', territory='DE')
 
+        Parsed identifiers are cached, so parsing the same identifier again
+        returns the same object without looking at the locale data:
+
+        >>> Locale.parse('de-DE', sep='-') is l
+        True
+
         :param identifier: the locale identifier string
         :param sep: optional component separator
         :return: a corresponding `Locale` instance
@@ -215,7 +277,14 @@ class Locale(object):
         :see: `parse_locale`
         """
         if isinstance(identifier, string_types):
-            return cls(*parse_locale(identifier, sep=sep))
+            key = (cls, identifier, sep)
+            locale = _parsed_locales.get(key)
+            if locale is None:
+                locale = cls(*parse_locale(identifier, sep=sep))
+                if len(_parsed_locales) >= _LOCALE_CACHE_SIZE:
+                    _parsed_locales.clear()
+                _parsed_locales[key] = locale
+            return locale
         return identifier
 
     def __eq__(self, other):
@@ -230,6 +299,10 @@ class Locale(object):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        return hash((self.language, self.territory, self.script,
+                     self.variant))
+
     def __repr__(self):
         parameters = ['']
         for key in ('territory', 'script', 'variant'):
@@ -245,9 +318,19 @@ class Locale(object):
 
     @property
     def _data(self):
-        if self.__data is None:
-            self.__data = localedata.LocaleDataDict(localedata.load(str(self)))
-        return self.__data
+        # The data is kept on the (shared) instance together with the wrapper
+        # resolving its aliases, but only used while it is still in the locale
+        # data cache, so that it can be evicted from there
+        data, wrapper = self._loaded
+        if data is not None and \
+                localedata._cache.get(self._identifier) is data:
+            return wrapper
+        data = wrapper = localedata.load(self._identifier)
+        if isinstance(data, localedata.ChainedLocaleData):
+            # flattened data has no aliases left to resolve
+            wrapper = localedata.LocaleDataDict(data)
+        self._loaded = (data, wrapper)
+        return wrapper
 
     def get_display_name(self, locale=None):
         """Return the display name of the locale using the given locale.
@@ -394,6 +477,18 @@ class Locale(object):
         :type: `dict`"""
         return self._data['decimal_formats']
 
+    @property
+    def compact_decimal_formats(self):
+        """Locale patterns for compact decimal number formatting, keyed by
+        format type ("short" or "long"), then by the magnitude of the number,
+        then by plural category.
+
+        The mapping is empty if the locale data contains no compact formats.
+
+        :type: `dict`
+        :since: version 1.0"""
+        return self._data.get('compact_decimal_formats', {})
+
     @property
     def currency_formats(self):
         """Locale patterns for currency number formatting.
@@ -22,6 +22,7 @@ following environment variables, in that order:
 """
 
 from __future__ import division, unicode_literals
+from bisect import bisect_right
 from datetime import date, datetime, time, timedelta
 import re
 
@@ -29,8 +30,9 @@ from babel.compat import integer_types
 from babel.core import default_locale, get_global, Locale
 from babel.util import UTC
 
-__all__ = ['format_date', 'format_datetime', 'format_time', 'format_timedelta',
-           'get_timezone_name', 'parse_date', 'parse_datetime', 'parse_time']
+__all__ = ['format_date', 'format_datetime', 'format_datetime_many',
+           'format_time', 'format_timedelta', 'get_timezone_name',
+           'parse_date', 'parse_datetime', 'parse_time']
 __docformat__ = 'restructuredtext en'
 
 LC_TIME = default_locale('LC_TIME')
@@ -193,6 +195,13 @@ def get_timezone_gmt(datetime=None, width='long', locale=LC_TIME):
     >>> get_timezone_gmt(dt, 'long', locale='fr_FR') == 'UTC-08:00'
     True
 
+    Offsets that are not whole hours keep their sign:
+
+    >>> tz = timezone('America/St_Johns')
+    >>> dt = tz.localize(datetime(2007, 1, 1))
+    >>> get_timezone_gmt(dt, locale='en') == 'GMT-03:30'
+    True
+
     :param datetime: the ``datetime`` object; if `None`, the current date and
                      time in UTC is used
     :param width: either "long" or "short"
@@ -211,12 +220,25 @@ def get_timezone_gmt(datetime=None, width='long', locale=LC_TIME):
 
     offset = datetime.tzinfo.utcoffset(datetime)
     seconds = offset.days * 24 * 60 * 60 + offset.seconds
-    hours, seconds = divmod(seconds, 3600)
+    key = (seconds, width, locale)
+    try:
+        return _timezone_gmt_offsets[key]
+    except KeyError:
+        pass
+    hours, minutes = divmod(abs(seconds) // 60, 60)
+    sign = seconds < 0 and '-' or '+'
     if width == 'short':
-        pattern = '%+03d%02d'
+        text = '%s%02d%02d' % (sign, hours, minutes)
     else:
-        pattern = locale.zone_formats['gmt'] % '%+03d:%02d'
-    return pattern % (hours, seconds // 60)
+        text = locale.zone_formats['gmt'] % ('%s%02d:%02d'
+                                             % (sign, hours, minutes))
+    if len(_timezone_gmt_offsets) >= _TIMEZONE_CACHE_SIZE:
+        _timezone_gmt_offsets.clear()
+    _timezone_gmt_offsets[key] = text
+    return text
+
+#: GMT offset representations, keyed by offset in seconds, width and locale
+_timezone_gmt_offsets = {}
 
 def get_timezone_location(dt_or_tzinfo=None, locale=LC_TIME):
     """Return a representation of the given timezone using "location format".
@@ -269,6 +291,28 @@ def get_timezone_location(dt_or_tzinfo=None, locale=LC_TIME):
     # Get the canonical time-zone code
     zone = get_global('zone_aliases').get(zone, zone)
 
+    key = (zone, locale)
+    try:
+        return _timezone_locations[key]
+    except KeyError:
+        pass
+    name = _get_timezone_location(zone, locale)
+    if len(_timezone_locations) >= _TIMEZONE_CACHE_SIZE:
+        _timezone_locations.clear()
+    _timezone_locations[key] = name
+    return name
+
+#: Time-zone names in location format, keyed by canonical zone and locale
+_timezone_locations = {}
+
+#: Time-zone display names, keyed by canonical zone, width, kind of time
+#: (see `get_timezone_name`), `uncommon` flag and locale; `None` means that
+#: the name falls back to the GMT offset or location format
+_timezone_names = {}
+
+_TIMEZONE_CACHE_SIZE = 5000
+
+def _get_timezone_location(zone, locale):
     info = locale.time_zones.get(zone, {})
 
     # Otherwise, if there is only one timezone for the country, return the
@@ -388,13 +432,44 @@ def get_timezone_name(dt_or_tzinfo=None, width='long', uncommon=False,
     # Get the canonical time-zone code
     zone = get_global('zone_aliases').get(zone, zone)
 
+    # The display name only depends on the date and time through the kind
+    # of time in effect, so that is what the names are cached by
+    if dt is None:
+        dst = kind = None
+    else:
+        dst = tzinfo.dst(dt)
+        if dst is None:
+            kind = 'unknown'
+        elif dst:
+            kind = 'daylight'
+        else:
+            kind = 'standard'
+    key = (zone, width, kind, uncommon, locale)
+    try:
+        name = _timezone_names[key]
+    except KeyError:
+        name = _get_timezone_name(zone, width, dt is not None, dst, uncommon,
+                                  locale)
+        if len(_timezone_names) >= _TIMEZONE_CACHE_SIZE:
+            _timezone_names.clear()
+        _timezone_names[key] = name
+    if name is not None:
+        return name
+
+    # If we have a concrete datetime, we assume that the result can't be
+    # independent of daylight savings time, so we return the GMT offset
+    if dt is not None:
+        return get_timezone_gmt(dt, width=width, locale=locale)
+
+    return get_timezone_location(dt_or_tzinfo, locale=locale)
+
+def _get_timezone_name(zone, width, has_time, dst, uncommon, locale):
     info = locale.time_zones.get(zone, {})
     # Try explicitly translated zone names first
     if width in info:
-        if dt is None:
+        if not has_time:
             field = 'generic'
         else:
-            dst = tzinfo.dst(dt)
             if dst is None:
                 field = 'generic'
             elif dst == 0:
@@ -408,20 +483,13 @@ def get_timezone_name(dt_or_tzinfo=None, width='long', uncommon=False,
     if metazone:
         metazone_info = locale.meta_zones.get(metazone, {})
         if width in metazone_info and (uncommon or metazone_info.get('common')):
-            if dt is None:
+            if not has_time:
                 field = 'generic'
             else:
-                field = tzinfo.dst(dt) and 'daylight' or 'standard'
+                field = dst and 'daylight' or 'standard'
             if field in metazone_info[width]:
                 return metazone_info[width][field]
 
-    # If we have a concrete datetime, we assume that the result can't be
-    # independent of daylight savings time, so we return the GMT offset
-    if dt is not None:
-        return get_timezone_gmt(dt, width=width, locale=locale)
-
-    return get_timezone_location(dt_or_tzinfo, locale=locale)
-
 def format_date(date=None, format='medium', locale=LC_TIME):
     """Return a date formatted according to the given pattern.
 
@@ -487,6 +555,77 @@ def format_datetime(datetime=None, format='medium', tzinfo=None,
     :param locale: a `Locale` object or a locale identifier
     :rtype: `unicode`
     """
+    datetime = _get_datetime(datetime, tzinfo)
+    locale = Locale.parse(locale)
+    if format in ('full', 'long', 'medium', 'short'):
+        pattern = _get_datetime_pattern(format, locale)
+    else:
+        pattern = parse_pattern(format)
+    return pattern.apply(datetime, locale)
+
+def format_datetime_many(datetimes, format='medium', tzinfo=None,
+                         locale=LC_TIME):
+    """Return a list of the given datetimes formatted according to the given
+    pattern.
+
+    This returns the same strings as calling `format_datetime` for every
+    value, but the locale and the pattern are only looked up once.
+
+    >>> format_datetime_many([datetime(2007, 4, 1, 15, 30), 1175441400],
+    ...                      locale='en_US') == ['Apr 1, 2007 3:30:00 PM',
+    ...                                          'Apr 1, 2007 3:30:00 PM']
+    True
+
+    NumPy ``datetime64`` arrays are supported as well, without NumPy being
+    required otherwise.
+
+    Unlike `format_datetime`, `None` items are not taken to mean the current
+    time, as they are usually missing values, like the ``NaT`` items of NumPy
+    arrays; a `ValueError` is raised for them instead:
+
+    >>> format_datetime_many([datetime(2007, 4, 1), None], locale='en_US')
+    Traceback (most recent call last):
+      ...
+    ValueError: cannot format missing datetime at index 1
+
+    :param datetimes: an iterable of `datetime` objects or POSIX timestamps
+    :param format: one of "full", "long", "medium", or "short", or a custom
+                   date/time pattern
+    :param tzinfo: the timezone to apply to the times for display
+    :param locale: a `Locale` object or a locale identifier
+    :return: the formatted datetimes
+    :rtype: `list`
+    :raise `ValueError`: if one of the items is `None`
+    :since: version 1.0
+    """
+    locale = Locale.parse(locale)
+    if format in ('full', 'long', 'medium', 'short'):
+        pattern = _get_datetime_pattern(format, locale)
+    else:
+        pattern = parse_pattern(format)
+    fields, tail = _get_compiled_pattern(pattern, locale)
+    dtype = getattr(datetimes, 'dtype', None)
+    if dtype is not None and dtype.kind == 'M':
+        # NumPy datetime64 array: convert the items to (naive, UTC) datetime
+        # objects in one go, as the items of arrays with a resolution finer
+        # than microseconds would be converted to integers
+        datetimes = datetimes.astype('datetime64[us]').tolist()
+    elif hasattr(datetimes, 'tolist'):
+        datetimes = datetimes.tolist()
+    result = []
+    for datetime in datetimes:
+        if datetime is None:
+            raise ValueError('cannot format missing datetime at index %d'
+                             % len(result))
+        datetime = _get_datetime(datetime, tzinfo)
+        result.append(''.join([text + field(datetime)
+                               for text, field in fields]) + tail)
+    return result
+
+def _get_datetime(datetime, tzinfo):
+    """Return the `datetime` object to format for a value passed to
+    `format_datetime`, converted to the given timezone.
+    """
     if datetime is None:
         datetime = datetime_.utcnow()
     elif isinstance(datetime, (int, float)):
@@ -496,18 +635,91 @@ def format_datetime(datetime=None, format='medium', tzinfo=None,
     if datetime.tzinfo is None:
         datetime = datetime.replace(tzinfo=UTC)
     if tzinfo is not None:
-        datetime = datetime.astimezone(tzinfo)
-        if hasattr(tzinfo, 'normalize'): # pytz
-            datetime = tzinfo.normalize(datetime)
+        datetime = _astimezone(datetime, tzinfo)
+    return datetime
 
-    locale = Locale.parse(locale)
-    if format in ('full', 'long', 'medium', 'short'):
-        return get_datetime_format(format, locale=locale) \
-            .replace('{0}', format_time(datetime, format, tzinfo=None,
-                                        locale=locale)) \
-            .replace('{1}', format_date(datetime, format, locale=locale))
-    else:
-        return parse_pattern(format).apply(datetime, locale)
+def _astimezone(datetime, tzinfo):
+    """Convert an aware `datetime` object to the given timezone, normalized
+    for ``pytz`` timezones.
+    """
+    if hasattr(tzinfo, '_utc_transition_times'): # pytz, with DST transitions
+        converter = _timezone_converters.get(tzinfo)
+        if converter is None:
+            if len(_timezone_converters) >= _TIMEZONE_CACHE_SIZE:
+                _timezone_converters.clear()
+            converter = _timezone_converters.setdefault(
+                tzinfo, _TimezoneConverter(tzinfo))
+        return converter.convert(datetime)
+    datetime = datetime.astimezone(tzinfo)
+    if hasattr(tzinfo, 'normalize'): # pytz
+        datetime = tzinfo.normalize(datetime)
+    return datetime
+
+#: `_TimezoneConverter` objects, keyed by ``pytz`` timezone
+_timezone_converters = {}
+
+
+class _TimezoneConverter(object):
+    """Converter of `datetime` objects to a ``pytz`` timezone with daylight
+    savings time transitions.
+
+    The transition interval containing a UTC time is found with a binary
+    search of the transition times of the timezone, the same way ``pytz``
+    does it. The interval of the last conversion is remembered, so converting
+    a series of sorted datetimes mostly needs no search at all.
+
+    >>> from pytz import timezone
+    >>> converter = _TimezoneConverter(timezone('Europe/Berlin'))
+    >>> converter.convert(datetime(2007, 4, 1, 12, 0, tzinfo=UTC))
+    datetime.datetime(2007, 4, 1, 14, 0, tzinfo=<DstTzInfo 'Europe/Berlin' CEST+2:00:00 DST>)
+    """
+
+    def __init__(self, tzinfo):
+        self.transitions = tzinfo._utc_transition_times
+        self.infos = [(info[0], tzinfo._tzinfos[info])
+                      for info in tzinfo._transition_info]
+        # (start, end, offset, tzinfo) of the last interval; empty at first
+        self.interval = (datetime_.max, datetime_.min, None, None)
+
+    def convert(self, datetime):
+        utc = datetime.replace(tzinfo=None) - datetime.utcoffset()
+        start, end, offset, tzinfo = self.interval
+        if not start <= utc < end:
+            idx = max(0, bisect_right(self.transitions, utc) - 1)
+            start = idx and self.transitions[idx] or datetime_.min
+            if idx + 1 < len(self.transitions):
+                end = self.transitions[idx + 1]
+            else:
+                end = datetime_.max
+            offset, tzinfo = self.infos[idx]
+            # replaced as a whole, so that other threads see a consistent
+            # interval
+            self.interval = (start, end, offset, tzinfo)
+        return (utc + offset).replace(tzinfo=tzinfo)
+
+#: The date/time patterns of the standard formats of every locale, with the
+#: date and time patterns filled into the datetime pattern, keyed by locale
+#: and format
+_datetime_patterns = {}
+
+def _get_datetime_pattern(format, locale):
+    """Return the `DateTimePattern` of a standard datetime format of the
+    locale.
+
+    >>> pattern = _get_datetime_pattern('medium', Locale.parse('en_US'))
+    >>> pattern.apply(datetime(2007, 4, 1, 15, 30),
+    ...               'en_US') == 'Apr 1, 2007 3:30:00 PM'
+    True
+    """
+    try:
+        return _datetime_patterns[(locale, format)]
+    except KeyError:
+        pass
+    pattern = get_datetime_format(format, locale=locale) \
+        .replace('{0}', get_time_format(format, locale=locale).pattern) \
+        .replace('{1}', get_date_format(format, locale=locale).pattern)
+    return _datetime_patterns.setdefault((locale, format),
+                                         parse_pattern(pattern))
 
 def format_time(time=None, format='medium', tzinfo=None, locale=LC_TIME):
     r"""Return a time formatted according to the given pattern.
@@ -579,9 +791,7 @@ def format_time(time=None, format='medium', tzinfo=None, locale=LC_TIME):
         time = time.replace(tzinfo=UTC)
     if isinstance(time, datetime):
         if tzinfo is not None:
-            time = time.astimezone(tzinfo)
-            if hasattr(tzinfo, 'normalize'): # pytz
-                time = tzinfo.normalize(time)
+            time = _astimezone(time, tzinfo)
         time = time.timetz()
     elif tzinfo is not None:
         time = time.replace(tzinfo=tzinfo)
@@ -762,7 +972,20 @@ class DateTimePattern(object):
         return self.format % other
 
     def apply(self, datetime, locale):
-        return self % DateTimeFormat(datetime, locale)
+        """Return the given date, datetime, or time formatted with the
+        pattern for the given locale.
+
+        >>> parse_pattern('EEEE, d. MMMM y').apply(date(2007, 4, 1),
+        ...                                     'de_DE') == 'Sonntag, 1. April 2007'
+        True
+
+        :param datetime: the ``date``, ``datetime`` or ``time`` object
+        :param locale: a `Locale` object or a locale identifier
+        :rtype: `unicode`
+        """
+        fields, tail = _get_compiled_pattern(self, Locale.parse(locale))
+        return ''.join([text + field(datetime)
+                        for text, field in fields]) + tail
 
 
 class DateTimeFormat(object):
@@ -958,6 +1181,121 @@ class DateTimeFormat(object):
         return week_number
 
 
+#: Patterns compiled into ``(fields, tail)`` tuples for a locale, keyed by
+#: the format string of the pattern and the locale; ``fields`` is a list of
+#: ``(text, field)`` tuples, where ``text`` is the literal text before the
+#: field, and ``field`` a function returning the formatted field of a value
+_compiled_patterns = {}
+
+def _get_compiled_pattern(pattern, locale):
+    key = (pattern.format, locale)
+    try:
+        return _compiled_patterns[key]
+    except KeyError:
+        pass
+    fields = []
+    text = []
+    pos = 0
+    for match in _pattern_fields_re.finditer(pattern.format):
+        text.append(pattern.format[pos:match.start()])
+        pos = match.end()
+        if match.group(1) is None: # an escaped percent sign
+            text.append('%')
+        else:
+            fields.append((''.join(text),
+                           _compile_field(match.group(1), locale)))
+            text = []
+    text.append(pattern.format[pos:])
+    compiled = (fields, ''.join(text))
+    if len(_compiled_patterns) >= _PATTERN_CACHE_SIZE:
+        _compiled_patterns.clear()
+    _compiled_patterns[key] = compiled
+    return compiled
+
+_pattern_fields_re = re.compile(r'%(?:\((\w+)\)s|%)')
+
+_name_widths = {3: 'abbreviated', 4: 'wide', 5: 'narrow'}
+
+def _compile_field(name, locale):
+    """Return a function formatting the given field of a value, with any
+    names the field needs looked up in the locale data in advance.
+
+    This produces the same results as `DateTimeFormat`, which is used for
+    the fields that need calendar calculations.
+    """
+    char = name[0]
+    num = len(name)
+    digits = '%%0%dd' % num
+    if char == 'G':
+        names = _resolve(get_era_names(_name_widths[max(3, num)], locale))
+        return lambda value: names[int(value.year >= 0)]
+    elif char in ('y', 'u'):
+        if num == 2:
+            return lambda value: (digits % value.year)[-2:]
+        return lambda value: digits % value.year
+    elif char in ('Q', 'q'):
+        if num <= 2:
+            return lambda value: digits % ((value.month - 1) // 3 + 1)
+        context = {'Q': 'format', 'q': 'stand-alone'}[char]
+        names = _resolve(get_quarter_names(_name_widths[num], context,
+                                           locale))
+        return lambda value: names[(value.month - 1) // 3 + 1]
+    elif char in ('M', 'L'):
+        if num <= 2:
+            return lambda value: digits % value.month
+        context = {'M': 'format', 'L': 'stand-alone'}[char]
+        names = _resolve(get_month_names(_name_widths[num], context, locale))
+        return lambda value: names[value.month]
+    elif char == 'd':
+        return lambda value: digits % value.day
+    elif char in ('E', 'e', 'c'):
+        if num < 3:
+            if char.islower():
+                offset = 7 - locale.first_week_day
+                return lambda value: \
+                    digits % ((offset + value.weekday()) % 7 + 1)
+            num = 3
+        context = {3: 'format', 4: 'format', 5: 'stand-alone'}[num]
+        names = _resolve(get_day_names(_name_widths[num], context, locale))
+        return lambda value: names[value.weekday()]
+    elif char == 'a':
+        names = get_period_names(locale)
+        names = (names['am'], names['pm'])
+        return lambda value: names[value.hour >= 12]
+    elif char == 'h':
+        return lambda value: digits % (value.hour % 12 or 12)
+    elif char == 'H':
+        return lambda value: digits % value.hour
+    elif char == 'K':
+        return lambda value: digits % (value.hour % 12)
+    elif char == 'k':
+        return lambda value: digits % (value.hour or 24)
+    elif char == 'm':
+        return lambda value: digits % value.minute
+    elif char == 's':
+        return lambda value: digits % value.second
+    elif char in ('z', 'Z', 'v', 'V'):
+        width = {3: 'short', 4: 'long'}[max(3, num)]
+        if char == 'z':
+            return lambda value: get_timezone_name(value, width,
+                                                   locale=locale)
+        elif char == 'Z':
+            return lambda value: get_timezone_gmt(value, width, locale=locale)
+        elif char == 'v':
+            return lambda value: get_timezone_name(value.tzinfo, width,
+                                                   locale=locale)
+        elif num == 1:
+            return lambda value: get_timezone_name(value.tzinfo, width,
+                                                   uncommon=True,
+                                                   locale=locale)
+        return lambda value: get_timezone_location(value.tzinfo,
+                                                   locale=locale)
+    return lambda value: DateTimeFormat(value, locale)[name]
+
+def _resolve(names):
+    return dict([(key, names[key]) for key in names])
+
+
 PATTERN_CHARS = {
     'G': [1, 2, 3, 4, 5],                                           # era
     'y': None, 'Y': None, 'u': None,                                # year
@@ -973,6 +1311,10 @@ PATTERN_CHARS = {
     'z': [1, 2, 3, 4], 'Z': [1, 2, 3, 4], 'v': [1, 4], 'V': [1, 4]  # zone
 }
 
+#: Parsed `DateTimePattern` objects, keyed by pattern string
+_pattern_cache = {}
+_PATTERN_CACHE_SIZE = 1000
+
 def parse_pattern(pattern):
     """Parse date, time, and datetime format patterns.
 
@@ -992,11 +1334,27 @@ def parse_pattern(pattern):
     >>> parse_pattern("hh' o''clock'").format == "%(hh)s o'clock"
     True
 
+    The parsed patterns are cached, so parsing the same pattern string again
+    returns the same object:
+
+    >>> parse_pattern('yyyy-MM-dd') is parse_pattern('yyyy-MM-dd')
+    True
+
     :param pattern: the formatting pattern to parse
     """
     if type(pattern) is DateTimePattern:
         return pattern
-
+    try:
+        return _pattern_cache[pattern]
+    except KeyError:
+        pass
+    parsed = _parse_pattern(pattern)
+    if len(_pattern_cache) >= _PATTERN_CACHE_SIZE:
+        _pattern_cache.clear()
+    _pattern_cache[pattern] = parsed
+    return parsed
+
+def _parse_pattern(pattern):
     result = []
     quotebuf = None
     charbuf = []
@@ -19,16 +19,198 @@ from __future__ import unicode_literals
        more convenient interface for accessing the locale data.
 """
 
+from copy import deepcopy
+from itertools import count
+import mmap
 import os
+import struct
 from collections import MutableMapping
 from babel.compat import pickle, PY3, threading
 
-__all__ = ['exists', 'locale_identifiers', 'load']
+__all__ = ['cache_info', 'exists', 'locale_identifiers', 'load', 'preload',
+           'set_backend', 'set_cache_policy']
 __docformat__ = 'restructuredtext en'
 
 _cache = {}
 _cache_lock = threading.RLock()
-_dirname = os.path.join(os.path.dirname(__file__), 'localedata')
+_load_locks = {}
+_dirname = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'localedata')
+
+#: Cache policy and statistics; `_access` records when each cached locale was
+#: last loaded, and `_sizes` the size of its data file. Reading the cache
+#: takes no lock, all changes to it are made while holding `_cache_lock`
+_policy = {'max_locales': None, 'max_bytes': None,
+           'pinned': frozenset(['root', 'en'])}
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_access = {}
+_sizes = {}
+#: Locales loaded by `preload`, which are never evicted
+_preloaded = set()
+_clock = count()
+
+#: File name extensions of the locale data files for each backend
+_extensions = {'pickle': '.dat', 'mmap': '.mdat', 'sections': '.mdat'}
+_backend = 'pickle'
+
+#: Header of the sectioned data files read by the "mmap" backend: a magic
+#: string followed by the length of the pickled section index
+_header = struct.Struct('>8sI')
+_magic = b'BABELMM1'
+
+
+def _read_index():
+    """Read the index of the locale data directory written by
+    ``import_cldr.py``.
+
+    The index is a dictionary with the parent of every locale (``parents``),
+    and, for each data file extension, the sizes of the data files of all
+    locales available in that format (``files``). If there is no index, the
+    data directory is probed instead.
+    """
+    filename = os.path.join(_dirname, 'index.idx')
+    if not os.path.isfile(filename):
+        return None
+    fileobj = open(filename, 'rb')
+    try:
+        return pickle.load(fileobj)
+    finally:
+        fileobj.close()
+
+_index = _read_index()
+if _index is not None and '.mdat' in _index['files']:
+    _backend = 'sections'
+
+
+def _is_flat():
+    """Whether the data files were written by ``import_cldr.py --flatten``,
+    and thus already contain the inherited data with all aliases resolved.
+    """
+    return _index is not None and _index.get('flat', False)
+
+
+def set_backend(name):
+    """Select the format of the locale data files that `load` reads.
+
+    The "pickle" backend unpickles a complete ``<locale>.dat`` file when a
+    locale is first loaded. The "sections" backend instead reads the sectioned
+    ``<locale>.mdat`` files written by ``import_cldr.py --format mmap``, and
+    only reads and unpickles a top-level key when it is first accessed, so
+    that for example formatting numbers does not load any time zone names.
+    The "mmap" backend also reads the sectioned files, but maps them into
+    memory; as the mapped pages are backed by the file, they are shared
+    between processes.
+
+    The "sections" backend is used by default if the sectioned files are
+    available, and the "pickle" backend otherwise.
+
+    >>> set_backend('json')
+    Traceback (most recent call last):
+      ...
+    ValueError: unknown locale data backend 'json'
+
+    Changing the backend discards any locale data loaded so far.
+
+    :param name: one of "pickle", "sections" or "mmap"
+    :raise `ValueError`: if the backend name is not known
+    :since: version 1.0
+    """
+    global _backend
+    if name not in _extensions:
+        raise ValueError('unknown locale data backend %r' % str(name))
+    _cache_lock.acquire()
+    try:
+        _backend = name
+        _cache.clear()
+        _access.clear()
+        _sizes.clear()
+        _preloaded.clear()
+    finally:
+        _cache_lock.release()
+
+
+def set_cache_policy(max_locales=None, max_bytes=None, pinned=('root', 'en')):
+    """Limit the amount of locale data that `load` keeps cached.
+
+    When a newly loaded locale makes the cache exceed one of the limits, the
+    locales that were least recently requested are discarded until the cache
+    fits again. Pinned locales, and locales whose data is still inherited by
+    other cached locales, are never discarded.
+
+    >>> set_cache_policy(max_locales=100, max_bytes=32 * 1024 * 1024)
+    >>> info = cache_info()
+    >>> info['max_locales'], info['max_bytes']
+    (100, 33554432)
+    >>> set_cache_policy()
+
+    :param max_locales: the maximum number of cached locales, or `None` for
+                        no limit
+    :param max_bytes: the maximum total size of the data files of the cached
+                      locales, or `None` for no limit
+    :param pinned: the identifiers of the locales that are never discarded
+    :since: version 1.0
+    """
+    _cache_lock.acquire()
+    try:
+        _policy['max_locales'] = max_locales
+        _policy['max_bytes'] = max_bytes
+        _policy['pinned'] = frozenset(pinned)
+        _evict()
+    finally:
+        _cache_lock.release()
+
+
+def cache_info():
+    """Return statistics about the locale data cache.
+
+    The returned dictionary contains the number of cached locales
+    (``locales``), the total size of their data files (``bytes``), the number
+    of `load` calls answered from the cache (``hits``) or from disk
+    (``misses``), the number of locales that were discarded (``evictions``),
+    and the limits set by `set_cache_policy` (``max_locales`` and
+    ``max_bytes``).
+
+    >>> load('en_US') is not None
+    True
+    >>> info = cache_info()
+    >>> info['locales'] > 0 and info['bytes'] > 0
+    True
+
+    :rtype: `dict`
+    :since: version 1.0
+    """
+    _cache_lock.acquire()
+    try:
+        info = dict(_stats)
+        info.update(locales=len(_cache), bytes=sum(_sizes.values()),
+                    max_locales=_policy['max_locales'],
+                    max_bytes=_policy['max_bytes'])
+        return info
+    finally:
+        _cache_lock.release()
+
+
+def _evict(keep=None):
+    """Discard the least recently used locales until the cache satisfies the
+    cache policy.
+    """
+    max_locales = _policy['max_locales']
+    max_bytes = _policy['max_bytes']
+    size = sum(_sizes.values())
+    while (max_locales is not None and len(_cache) > max_locales) or \
+            (max_bytes is not None and size > max_bytes):
+        parents = set([_parent(name) for name in _cache if name != 'root'])
+        candidates = [(_access[name], name) for name in _cache
+                      if name != keep and name not in parents and
+                      name not in _policy['pinned'] and
+                      name not in _preloaded]
+        if not candidates:
+            break
+        name = min(candidates)[1]
+        del _cache[name]
+        _access.pop(name, None)
+        size -= _sizes.pop(name)
+        _stats['evictions'] += 1
 
 
 def exists(name):
@@ -40,7 +222,9 @@ def exists(name):
     """
     if name in _cache:
         return True
-    return os.path.exists(os.path.join(_dirname, '%s.dat' % name))
+    if _index is not None:
+        return name in _index['files'].get(_extensions[_backend], ())
+    return os.path.exists(_filename(name))
 
 
 def locale_identifiers():
@@ -51,9 +235,12 @@ def locale_identifiers():
     :rtype: `list`
     :since: version 0.8.1
     """
+    if _index is not None:
+        return [name for name in _index['files'].get(_extensions[_backend], ())
+                if name != 'root']
     return [stem for stem, extension in [
         os.path.splitext(filename) for filename in os.listdir(_dirname)
-    ] if extension == '.dat' and stem != 'root']
+    ] if extension == _extensions[_backend] and stem != 'root']
 
 
 def load(name, merge_inherited=True):
@@ -67,6 +254,17 @@ def load(name, merge_inherited=True):
     >>> d['languages']['sv'] == 'Swedish'
     True
 
+    The inherited data is not copied into the data of the requested locale.
+    Instead, the returned `ChainedLocaleData` mapping looks up every key in
+    the data of the locale itself, then in that of its parent locales up to
+    "root", and merges what it finds when the key is first accessed:
+
+    >>> d = load('de_AT')
+    >>> d['languages']['de'] == 'Deutsch'
+    True
+    >>> d['languages'] is not load('de')['languages']
+    True
+
     Note that the results are cached, and subsequent requests for the same
     locale return the same dictionary:
 
@@ -75,41 +273,152 @@ def load(name, merge_inherited=True):
     >>> d1 is d2
     True
 
+    The size of the cache can be limited using `set_cache_policy`.
+
+    If the data files were written by ``import_cldr.py --flatten``, they
+    already contain the inherited data, with all aliases resolved, and the
+    data of the locale is returned as is, whether `merge_inherited` is set or
+    not.
+
     :param name: the locale identifier string (or "root")
     :param merge_inherited: whether the inherited data should be merged into
                             the data of the requested locale
     :return: the locale data
-    :rtype: `dict`
+    :rtype: `ChainedLocaleData`, or `dict` if `merge_inherited` is `False` or
+            the data is flattened
     :raise `IOError`: if no locale data file is found for the given locale
                       identifer, or one of the locales it inherits from
     """
-    _cache_lock.acquire()
+    data = _cache.get(name)
+    if not merge_inherited and not _is_flat():
+        if data is not None:
+            return data.maps[0]
+        return _read(name)
+    if data is not None:
+        # Cache hits take no lock, so the statistics are only approximate
+        _stats['hits'] += 1
+        _access[name] = next(_clock)
+        return data
+
+    # Cold loads only lock the requested locale, so that different locales
+    # can be loaded concurrently
+    lock = _load_locks.get(name)
+    if lock is None:
+        _cache_lock.acquire()
+        try:
+            lock = _load_locks.setdefault(name, threading.Lock())
+        finally:
+            _cache_lock.release()
+    lock.acquire()
     try:
         data = _cache.get(name)
-        if not data:
-            # Load inherited data
-            if name == 'root' or not merge_inherited:
-                data = {}
-            else:
-                parts = name.split('_')
-                if len(parts) == 1:
-                    parent = 'root'
-                else:
-                    parent = '_'.join(parts[:-1])
-                data = load(parent).copy()
-            filename = os.path.join(_dirname, '%s.dat' % name)
-            fileobj = open(filename, 'rb')
-            try:
-                if name != 'root' and merge_inherited:
-                    merge(data, pickle.load(fileobj))
-                else:
-                    data = pickle.load(fileobj)
-                _cache[name] = data
-            finally:
-                fileobj.close()
+        if data is not None: # loaded by another thread in the meantime
+            _stats['hits'] += 1
+            _access[name] = next(_clock)
+            return data
+        if _is_flat():
+            data = _read(name)
+        else:
+            maps = [_read(name)]
+            if name != 'root':
+                maps.extend(load(_parent(name)).maps)
+            data = ChainedLocaleData(maps)
+        size = _size(name)
+        _cache_lock.acquire()
+        try:
+            _stats['misses'] += 1
+            _access[name] = next(_clock)
+            _sizes[name] = size
+            _cache[name] = data
+            _evict(keep=name)
+        finally:
+            _cache_lock.release()
         return data
     finally:
-        _cache_lock.release()
+        # The lock is only needed while the locale is being loaded; threads
+        # still waiting for it hold on to it, and later ones find the data in
+        # the cache, or load it again if this load failed
+        _cache_lock.acquire()
+        try:
+            if _load_locks.get(name) is lock:
+                del _load_locks[name]
+        finally:
+            _cache_lock.release()
+        lock.release()
+
+
+def preload(locales, resolve_aliases=True):
+    """Load the data of the given locales, and materialize all of it.
+
+    Every value of the locale data, including the values inherited from the
+    parent locales and the number and date patterns, is computed and stored
+    in the cached data, and the locales are never evicted from the cache.
+    Calling this in the parent process of a pre-forking server lets the
+    worker processes share the data instead of each loading it on the first
+    request for a locale.
+
+    :param locales: an iterable of locale identifiers or `Locale` objects
+    :param resolve_aliases: whether the aliases in the locale data should be
+                            resolved and the resolved values stored as well
+    :since: version 1.0
+    """
+    from babel.core import Locale
+    for locale in locales:
+        locale = Locale.parse(locale)
+        name = str(locale)
+        data = load(name)
+        if resolve_aliases and isinstance(data, ChainedLocaleData):
+            data = LocaleDataDict(data)
+        _materialize(data)
+        _cache_lock.acquire()
+        try:
+            _preloaded.add(name)
+        finally:
+            _cache_lock.release()
+
+
+def _materialize(data):
+    for key in data:
+        value = data[key]
+        if isinstance(value, tuple): # an alias with overrides
+            value = value[1]
+        if isinstance(value, (dict, ChainedLocaleData, LocaleDataDict)):
+            _materialize(value)
+
+
+def _read(name):
+    """Read the data defined by the locale itself from its data file."""
+    filename = _filename(name)
+    if _backend == 'mmap':
+        return MappedLocaleData(filename)
+    elif _backend == 'sections':
+        return SectionedLocaleData(filename)
+    fileobj = open(filename, 'rb')
+    try:
+        return pickle.load(fileobj)
+    finally:
+        fileobj.close()
+
+
+def _filename(name):
+    return os.path.join(_dirname, name + _extensions[_backend])
+
+
+def _size(name):
+    if _index is not None:
+        sizes = _index['files'].get(_extensions[_backend], {})
+        if name in sizes:
+            return sizes[name]
+    return os.path.getsize(_filename(name))
+
+
+def _parent(name):
+    if _index is not None and name in _index['parents']:
+        return _index['parents'][name]
+    parts = name.split('_')
+    if len(parts) == 1:
+        return 'root'
+    return '_'.join(parts[:-1])
 
 
 def merge(dict1, dict2):
@@ -127,7 +436,7 @@ def merge(dict1, dict2):
     for key, val2 in dict2.items():
         if val2 is not None:
             val1 = dict1.get(key)
-            if isinstance(val2, dict):
+            if type(val2) is dict or type(val2) is ChainedLocaleData:
                 if val1 is None:
                     val1 = {}
                 if isinstance(val1, Alias):
@@ -145,6 +454,57 @@ def merge(dict1, dict2):
             dict1[key] = val1
 
 
+def flatten(data):
+    """Return a copy of the locale data with all aliases resolved, made up of
+    plain dictionaries only.
+
+    >>> d = flatten({'x': {'a': 1}, 'y': Alias(['x']),
+    ...              'z': (Alias(['x']), {'b': 2})})
+    >>> d['y'] == {'a': 1}, d['z'] == {'a': 1, 'b': 2}
+    (True, True)
+
+    :param data: the locale data, including the inherited data
+    :type data: `dict`
+    """
+    return _flatten(LocaleDataDict(deepcopy(data)))
+
+
+def _flatten(data):
+    result = {}
+    for key in data:
+        value = data[key]
+        if isinstance(value, LocaleDataDict):
+            value = _flatten(value)
+        result[key] = value
+    return result
+
+
+def dump_sectioned(data, fileobj):
+    """Write locale data to a file in the sectioned format read by the "mmap"
+    backend.
+
+    Every top-level value is pickled separately, and an index of the offsets
+    and sizes of the pickles is written in front of them, so that individual
+    keys can be decoded without reading the rest of the file.
+
+    :param data: the locale data dictionary
+    :param fileobj: the binary file object to write to
+    """
+    index = {}
+    blobs = []
+    offset = 0
+    for key, value in data.items():
+        blob = pickle.dumps(value, 2)
+        index[key] = (offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+    index = pickle.dumps(index, 2)
+    fileobj.write(_header.pack(_magic, len(index)))
+    fileobj.write(index)
+    for blob in blobs:
+        fileobj.write(blob)
+
+
 class Alias(object):
     """Representation of an alias in the locale data.
 
@@ -197,13 +557,17 @@ class LocaleDataDict(MutableMapping):
 
     def __getitem__(self, key):
         orig = val = self._data[key]
+        if type(val) is LocaleDataDict: # resolved by an earlier lookup
+            return val
         if isinstance(val, Alias): # resolve an alias
             val = val.resolve(self.base)
         if isinstance(val, tuple): # Merge a partial dict with an alias
             alias, others = val
             val = alias.resolve(self.base).copy()
             merge(val, others)
-        if type(val) is dict: # Return a nested alias-resolving dict
+        # (exact type checks, as isinstance() is slow for the ABC subclass)
+        if type(val) is dict or type(val) is ChainedLocaleData:
+            # Return a nested alias-resolving dict
             val = LocaleDataDict(val, base=self.base)
         if val is not orig:
             self._data[key] = val
@@ -217,3 +581,165 @@ class LocaleDataDict(MutableMapping):
 
     def copy(self):
         return LocaleDataDict(self._data.copy(), base=self.base)
+
+
+class ChainedLocaleData(MutableMapping):
+    """Layered view of the data of a locale and the locales it inherits from.
+
+    Like `merge`, looking up a key merges the values found in the `maps`,
+    which are ordered from the most to the least specific locale, but nested
+    dictionaries are layered instead of copied. Computed values, and any
+    values set on the mapping, are stored in the view itself, so the
+    underlying locale data is never modified and can be shared by all the
+    locales that inherit from it.
+
+    >>> d = ChainedLocaleData([{'x': {'a': 1}}, {'x': {'a': 0, 'b': 2}}])
+    >>> d['x']['a'], d['x']['b']
+    (1, 2)
+    """
+
+    def __init__(self, maps):
+        self.maps = maps
+        self._values = {}
+        self._keys = None
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, dict(self.items()))
+
+    def __len__(self):
+        return len(self._get_keys())
+
+    def __iter__(self):
+        return iter(self._get_keys())
+
+    def __contains__(self, key):
+        return key in self._get_keys()
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            if self._keys is not None and key not in self._keys:
+                raise
+        dicts = []
+        for data in self.maps:
+            val = data.get(key)
+            if val is None:
+                continue
+            if type(val) is not dict:
+                if not dicts:
+                    break
+                if isinstance(val, Alias):
+                    val = (val, ChainedLocaleData(dicts))
+                elif isinstance(val, tuple):
+                    alias, others = val
+                    val = (alias, ChainedLocaleData(dicts + [others]))
+                else:
+                    val = ChainedLocaleData(dicts)
+                break
+            dicts.append(val)
+        else:
+            if not dicts:
+                raise KeyError(key)
+            val = ChainedLocaleData(dicts)
+        self._values[key] = val
+        return val
+
+    def __setitem__(self, key, value):
+        self._get_keys().add(key)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        self._get_keys().remove(key)
+        self._values.pop(key, None)
+
+    def _get_keys(self):
+        if self._keys is None:
+            keys = set(self._values)
+            for data in self.maps:
+                keys.update(data)
+            self._keys = keys
+        return self._keys
+
+    def copy(self):
+        data = ChainedLocaleData(self.maps)
+        data._values = self._values.copy()
+        data._keys = self._keys and self._keys.copy()
+        return data
+
+
+class SectionedLocaleData(MutableMapping):
+    """Locale data read lazily from a sectioned data file.
+
+    Only the index of the sections is read when the data is created; each
+    top-level key is read from the file and unpickled when it is first
+    accessed.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        magic, size = _header.unpack(self._read(0, _header.size))
+        if magic != _magic:
+            raise IOError('%r is not a sectioned locale data file' % filename)
+        self._start = _header.size + size
+        self._index = pickle.loads(self._read(_header.size, size))
+        self._keys = set(self._index)
+        self._values = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            if key not in self._index or key not in self._keys:
+                raise
+        offset, size = self._index[key]
+        val = pickle.loads(self._read(self._start + offset, size))
+        # if another thread read the key in the meantime, use its value
+        return self._values.setdefault(key, val)
+
+    def __setitem__(self, key, value):
+        self._keys.add(key)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        self._keys.remove(key)
+        self._values.pop(key, None)
+
+    def _read(self, offset, size):
+        fileobj = open(self.filename, 'rb')
+        try:
+            fileobj.seek(offset)
+            return fileobj.read(size)
+        finally:
+            fileobj.close()
+
+    def copy(self):
+        return dict(self.items())
+
+
+class MappedLocaleData(SectionedLocaleData):
+    """Locale data read lazily from a memory-mapped sectioned data file.
+
+    Each top-level key is only unpickled from the mapped file when it is first
+    accessed.
+    """
+
+    def __init__(self, filename):
+        fileobj = open(filename, 'rb')
+        try:
+            self._map = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            fileobj.close()
+        SectionedLocaleData.__init__(self, filename)
+
+    def _read(self, offset, size):
+        return self._map[offset:offset + size]
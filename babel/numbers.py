@@ -25,16 +25,20 @@ following environment variables, in that order:
 # TODO:
 #  Padding and rounding increments in pattern:
 #  - http://www.unicode.org/reports/tr35/ (Appendix G.6)
+import copy
 from decimal import Decimal, InvalidOperation
-import math
 import re
 
-from babel.compat import long_type, PY3, xrange
-from babel.core import default_locale, Locale
+from babel.compat import integer_types, long_type, PY3, xrange
+from babel.core import default_locale, get_global, Locale
 
 __all__ = ['format_number', 'format_decimal', 'format_currency',
-           'format_percent', 'format_scientific', 'parse_number',
-           'parse_decimal', 'NumberFormatError']
+           'get_currency_precision',
+           'format_percent', 'format_scientific', 'format_compact_decimal',
+           'format_decimal_many',
+           'format_currency_many', 'format_percent_many', 'parse_number',
+           'parse_decimal', 'NumberFormatError', 'NumberFormatter',
+           'NumberParser']
 __docformat__ = 'restructuredtext en'
 
 LC_NUMERIC = default_locale('LC_NUMERIC')
@@ -66,6 +70,26 @@ def get_currency_symbol(currency, locale=LC_NUMERIC):
     """
     return Locale.parse(locale).currency_symbols.get(currency, currency)
 
+def get_currency_precision(currency):
+    """Return the number of fraction digits used for amounts of the given
+    currency.
+
+    >>> get_currency_precision('USD')
+    2
+    >>> get_currency_precision('JPY')
+    0
+
+    :param currency: the currency code
+    :return: the number of fraction digits
+    :rtype: `int`
+    :since: version 1.0
+    """
+    fractions = get_global('currency_fractions')
+    try:
+        return fractions[currency][0]
+    except KeyError:
+        return fractions.get('DEFAULT', (2, 0))[0]
+
 def get_decimal_symbol(locale=LC_NUMERIC):
     """Return the symbol used by the locale to separate decimal fractions.
 
@@ -174,7 +198,8 @@ def format_decimal(number, format=None, locale=LC_NUMERIC):
     pattern = parse_pattern(format)
     return pattern.apply(number, locale)
 
-def format_currency(number, currency, format=None, locale=LC_NUMERIC):
+def format_currency(number, currency, format=None, locale=LC_NUMERIC,
+                    currency_digits=True):
     """Return formatted currency value.
 
     >>> format_currency(1099.98, 'USD', locale='en_US') == '$1,099.98'
@@ -189,17 +214,47 @@ def format_currency(number, currency, format=None, locale=LC_NUMERIC):
     >>> format_currency(1099.98, 'EUR', '\u00a4\u00a4 #,##0.00', locale='en_US') == 'EUR 1,099.98'
     True
 
+    By default, amounts are formatted with the number of fraction digits of
+    the currency, rather than those of the pattern:
+
+    >>> format_currency(1099.98, 'JPY', locale='en_US') == '\xa51,100'
+    True
+    >>> format_currency(1099.98, 'JPY', locale='en_US',
+    ...                 currency_digits=False) == '\xa51,099.98'
+    True
+
     :param number: the number to format
     :param currency: the currency code
     :param locale: the `Locale` object or locale identifier
+    :param currency_digits: whether to use the number of fraction digits of
+                            the currency instead of those of the pattern
     :return: the formatted currency value
     :rtype: `unicode`
     """
     locale = Locale.parse(locale)
+    return _get_currency_formatter(locale, currency, format,
+                                   currency_digits).format(number)
+
+#: `NumberFormatter` objects for currencies, keyed by locale, currency code,
+#: pattern, and whether the currency fraction digits are used
+_currency_formatters = {}
+
+def _get_currency_formatter(locale, currency, format, currency_digits):
+    key = (locale, currency, format, currency_digits)
+    try:
+        return _currency_formatters[key]
+    except KeyError:
+        pass
     if not format:
-        format = locale.currency_formats.get(format)
-    pattern = parse_pattern(format)
-    return pattern.apply(number, locale, currency=currency)
+        pattern = locale.currency_formats.get(format)
+    else:
+        pattern = format
+    formatter = NumberFormatter(locale, pattern, currency,
+                                currency_digits=currency_digits)
+    if len(_currency_formatters) >= _PATTERN_CACHE_SIZE:
+        _currency_formatters.clear()
+    _currency_formatters[key] = formatter
+    return formatter
 
 def format_percent(number, format=None, locale=LC_NUMERIC):
     """Return formatted percent value for a specific locale.
@@ -251,6 +306,202 @@ def format_scientific(number, format=None, locale=LC_NUMERIC):
     pattern = parse_pattern(format)
     return pattern.apply(number, locale)
 
+def format_compact_decimal(number, format_type='short', fraction_digits=0,
+                           locale=LC_NUMERIC):
+    """Return the given number formatted in the compact form of a specific
+    locale, such as "1.2K" or "3,4 Mio.".
+
+    The number is divided by the largest magnitude for which the locale has
+    a compact pattern and that is not larger than the number, and rounded to
+    at most `fraction_digits` fraction digits. If the locale data has no
+    compact patterns, or the number is too small to be abbreviated, the
+    number is formatted with `format_decimal`, rounded in the same way.
+
+    >>> format_compact_decimal(123, locale='en_US') == '123'
+    True
+
+    :param number: the number to format
+    :param format_type: the type of compact format, either "short" or "long"
+    :param fraction_digits: the maximum number of fraction digits
+    :param locale: the `Locale` object or locale identifier
+    :return: the formatted number
+    :rtype: `unicode`
+    :since: version 1.0
+    """
+    locale = Locale.parse(locale)
+    if isinstance(number, float):
+        number = Decimal(str(number))
+    formatter = _get_compact_formatter(locale, fraction_digits)
+    table = _get_compact_table(locale, format_type)
+    for idx, (magnitude, patterns) in enumerate(table):
+        if abs(number) >= magnitude:
+            break
+    else: # smaller than all magnitudes
+        idx = len(table)
+        patterns = {}
+    pattern = patterns.get('other')
+    divisor = pattern is not None and pattern[0] or 1
+    value = bankersround(Decimal(number) / divisor, fraction_digits)
+    if idx and abs(value) * divisor >= table[idx - 1][0]:
+        # the number rounds up to the next magnitude, e.g. 999999 to 1000K,
+        # or 999.5 to 1000
+        patterns = table[idx - 1][1]
+        pattern = patterns.get('other')
+        if pattern is not None:
+            value = bankersround(Decimal(number) / pattern[0],
+                                 fraction_digits)
+    if pattern is None:
+        return formatter.format(number)
+    # the plural form depends on the displayed value, e.g. "1 million" for
+    # 999999
+    divisor, zeros, prefix, suffix = _select_compact_pattern(patterns, value,
+                                                             locale)
+    text = formatter.format(abs(Decimal(number) / divisor))
+    return '%s%s%s%s' % (number < 0 and '-' or '', prefix, text, suffix)
+
+#: Compact number patterns by locale and format type, as lists of
+#: ``(magnitude, {plural_category: pattern})`` tuples in descending order of
+#: magnitude, and the formatters used for compact numbers
+_compact_tables = {}
+_compact_formatters = {}
+
+def _get_compact_table(locale, format_type):
+    table = _compact_tables.get((locale, format_type))
+    if table is not None:
+        return table
+    table = []
+    formats = locale.compact_decimal_formats.get(format_type, {})
+    for magnitude, counts in formats.items():
+        magnitude = int(magnitude)
+        table.append((magnitude, dict([
+            (count, _parse_compact_pattern(magnitude, pattern))
+            for count, pattern in counts.items()
+        ])))
+    table.sort(key=lambda item: item[0], reverse=True)
+    if len(_compact_tables) >= _PATTERN_CACHE_SIZE:
+        _compact_tables.clear()
+    _compact_tables[(locale, format_type)] = table
+    return table
+
+def _parse_compact_pattern(magnitude, pattern):
+    """Return the ``(divisor, zeros, prefix, suffix)`` tuple of a compact
+    number pattern, or `None` if the pattern is "0", meaning that numbers of
+    that magnitude are not abbreviated.
+
+    >>> _parse_compact_pattern(10000, "00 'K'") == (1000, 2, '', ' K')
+    True
+    """
+    if pattern == '0':
+        return None
+    prefix, number, suffix = number_re.search(pattern).groups()
+    zeros = number.count('0')
+    return (magnitude // 10 ** (zeros - 1), zeros, _unquote(prefix),
+            _unquote(suffix))
+
+def _unquote(text):
+    return re.sub("'([^']*)'", lambda match: match.group(1) or "'", text)
+
+def _select_compact_pattern(patterns, value, locale):
+    pattern = patterns['other']
+    try:
+        plural_form = locale.plural_form(abs(value))
+    except KeyError: # no plural rules for the locale
+        return pattern
+    return patterns.get(plural_form, pattern)
+
+def _get_compact_formatter(locale, fraction_digits):
+    key = (locale, fraction_digits)
+    try:
+        return _compact_formatters[key]
+    except KeyError:
+        pass
+    pattern = '#,##0'
+    if fraction_digits:
+        pattern += '.' + '#' * fraction_digits
+    formatter = NumberFormatter(locale, pattern)
+    if len(_compact_formatters) >= _PATTERN_CACHE_SIZE:
+        _compact_formatters.clear()
+    _compact_formatters[key] = formatter
+    return formatter
+
+def format_decimal_many(numbers, format=None, locale=LC_NUMERIC):
+    """Return a list of the given decimal numbers formatted for a specific
+    locale.
+
+    This returns the same strings as calling `format_decimal` for every
+    number, but the locale and the pattern are only looked up once.
+
+    >>> format_decimal_many([1, 1234.5, -0.25], locale='en_US') == \\
+    ...     ['1', '1,234.5', '-0.25']
+    True
+
+    :param numbers: an iterable of the numbers to format; one-dimensional
+                    ``array.array`` and NumPy arrays are supported as well
+    :param format:
+    :param locale: the `Locale` object or locale identifier
+    :return: the formatted decimal numbers
+    :rtype: `list`
+    :since: version 1.0
+    """
+    locale = Locale.parse(locale)
+    if not format:
+        format = locale.decimal_formats.get(format)
+    return _format_many(numbers, NumberFormatter(locale, format))
+
+def format_currency_many(numbers, currency, format=None, locale=LC_NUMERIC,
+                         currency_digits=True):
+    """Return a list of the given currency values formatted for a specific
+    locale.
+
+    >>> format_currency_many([1099.98, -5], 'USD', locale='en_US') == \\
+    ...     ['$1,099.98', '($5.00)']
+    True
+
+    :param numbers: an iterable of the numbers to format; one-dimensional
+                    ``array.array`` and NumPy arrays are supported as well
+    :param currency: the currency code
+    :param format:
+    :param locale: the `Locale` object or locale identifier
+    :param currency_digits: whether to use the number of fraction digits of
+                            the currency instead of those of the pattern
+    :return: the formatted currency values
+    :rtype: `list`
+    :since: version 1.0
+    """
+    locale = Locale.parse(locale)
+    return _format_many(numbers, _get_currency_formatter(locale, currency,
+                                                         format,
+                                                         currency_digits))
+
+def format_percent_many(numbers, format=None, locale=LC_NUMERIC):
+    """Return a list of the given percent numbers formatted for a specific
+    locale.
+
+    >>> format_percent_many([0.34, 25.1234], locale='en_US') == \\
+    ...     ['34%', '2,512%']
+    True
+
+    :param numbers: an iterable of the numbers to format; one-dimensional
+                    ``array.array`` and NumPy arrays are supported as well
+    :param format:
+    :param locale: the `Locale` object or locale identifier
+    :return: the formatted percent numbers
+    :rtype: `list`
+    :since: version 1.0
+    """
+    locale = Locale.parse(locale)
+    if not format:
+        format = locale.percent_formats.get(format)
+    return _format_many(numbers, NumberFormatter(locale, format))
+
+def _format_many(numbers, formatter):
+    if hasattr(numbers, 'tolist'):
+        # array.array or NumPy array: convert the items to Python numbers in
+        # one go, which also avoids formatting NumPy scalar types
+        numbers = numbers.tolist()
+    format = formatter.format
+    return [format(number) for number in numbers]
+
 
 class NumberFormatError(ValueError):
     """Exception raised when a string cannot be parsed into a number."""
@@ -316,6 +567,154 @@ def parse_decimal(string, locale=LC_NUMERIC):
         raise NumberFormatError("'%s' is not a valid decimal number" % string)
 
 
+class NumberParser(object):
+    """Strict parser of localized numbers.
+
+    Unlike `parse_decimal`, the parser only accepts the digit grouping used
+    by the locale, and it also accepts numbers with a sign, a percent sign,
+    a currency symbol or code, or in parentheses for negative amounts:
+
+    >>> parser = NumberParser('de_DE')
+    >>> parser.parse('1.099,98')
+    Decimal('1099.98')
+    >>> parser.parse('-1.099.000')
+    Decimal('-1099000')
+    >>> parser.parse('12,5 %')
+    Decimal('0.125')
+    >>> parser.parse('(4,50 \u20ac)')
+    Decimal('-4.50')
+    >>> try:
+    ...     parser.parse('10.99,98')
+    ... except NumberFormatError as e:
+    ...     msg = str(e)
+    >>> msg
+    "'10.99,98' is not a valid number"
+
+    The regular expression used for parsing is built once per locale, so
+    parsers are cheap to create, and one parser can be used to parse many
+    numbers:
+
+    >>> parser.parse_many(['1', '2,5'])
+    [Decimal('1'), Decimal('2.5')]
+
+    :since: version 1.0
+    """
+
+    def __init__(self, locale=LC_NUMERIC):
+        """Create the parser.
+
+        :param locale: the `Locale` object or locale identifier
+        """
+        self.locale = Locale.parse(locale)
+        self._regex, self._group, self._minus_signs = \
+                _get_number_regex(self.locale)
+
+    def parse(self, string):
+        """Parse a localized number into a decimal.
+
+        Percent values are divided by 100, and any currency is ignored.
+
+        :param string: the string to parse
+        :return: the parsed number
+        :rtype: `Decimal`
+        :raise `NumberFormatError`: if the string is not a valid number
+        """
+        match = self._regex.match(string)
+        if match is None:
+            raise NumberFormatError("'%s' is not a valid number" % string)
+        negative, sign, percent, currency, sign2, integer, fraction, \
+                percent2 = match.groups()
+        number = integer.replace(self._group, '')
+        if fraction:
+            number += '.' + fraction
+        value = Decimal(number)
+        if percent or percent2:
+            value = value.scaleb(-2)
+        if negative or (sign or sign2) in self._minus_signs:
+            value = -value
+        return value
+
+    def parse_many(self, strings):
+        """Parse an iterable of localized numbers.
+
+        :param strings: an iterable of the strings to parse
+        :return: the parsed numbers
+        :rtype: `list`
+        :raise `NumberFormatError`: if one of the strings is not a valid
+                                    number
+        """
+        parse = self.parse
+        return [parse(string) for string in strings]
+
+    def stream(self, lines):
+        """Parse the lines of a text file, or of another iterable, containing
+        one localized number each, and yield the parsed numbers.
+
+        Blank lines are skipped.
+
+        :param lines: an iterable of lines, such as a file object
+        :return: an iterator over the parsed numbers
+        :raise `NumberFormatError`: if one of the lines is not a valid number
+        """
+        parse = self.parse
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield parse(line)
+
+
+#: Compiled `NumberParser` regular expressions, keyed by locale
+_number_regexes = {}
+
+def _get_number_regex(locale):
+    regex = _number_regexes.get(locale)
+    if regex is not None:
+        return regex
+    symbols = locale.number_symbols
+    group = symbols.get('group', ',')
+    decimal = symbols.get('decimal', '.')
+    minus_signs = set(['-', symbols.get('minusSign', '-')])
+    signs = minus_signs | set(['+', symbols.get('plusSign', '+')])
+    # the patterns contain an ASCII percent sign, even if the locale has its
+    # own symbol
+    percents = set(['%', symbols.get('percentSign', '%')])
+    # only the symbols of the locale and known ISO 4217 codes are accepted
+    currencies = set(locale.currency_symbols.values())
+    currencies.update(locale.currencies)
+    currencies.update(get_global('currency_fractions'))
+    currencies.discard('DEFAULT')
+    g1, g2 = parse_pattern(locale.decimal_formats.get(None)).grouping
+
+    def alternatives(strings):
+        strings = sorted(strings, key=lambda string: (-len(string), string))
+        return '|'.join([re.escape(string) for string in strings])
+
+    integer = '[0-9]+'
+    if g1 < 1000:
+        integer = '[0-9]{1,%d}(?:%s[0-9]{%d})*%s[0-9]{%d}|%s' % (
+            g2, re.escape(group), g2, re.escape(group), g1, integer)
+    # groups: opening parenthesis, sign, percent sign before the number,
+    # currency before the number, sign after that percent sign or currency,
+    # integer digits, fraction digits, percent sign after the number; a
+    # number has at most one sign, which is not allowed in parentheses, and
+    # at most one percent sign or currency, either before or after it
+    regex = re.compile(''.join([
+        r'\s*(\()?\s*(?(1)|(%s)?)\s*' % alternatives(signs),
+        r'(?:(%s)\s*|(%s)\s*)?' % (alternatives(percents),
+                                   alternatives(currencies)),
+        r'(?(1)|(?(2)|(%s)?))' % alternatives(signs),
+        r'(%s)(?:%s([0-9]+))?\s*' % (integer, re.escape(decimal)),
+        r'(?(3)|(?(4)|(?:(%s)|%s)?))' % (alternatives(percents),
+                                         alternatives(currencies)),
+        r'\s*(?(1)\))\s*$'
+    ]), re.UNICODE)
+    if len(_number_regexes) >= _PATTERN_CACHE_SIZE:
+        _number_regexes.clear()
+    regex = (regex, group, frozenset(minus_signs))
+    _number_regexes[locale] = regex
+    return regex
+
+
 PREFIX_END = r'[^0-9@#.,]'
 NUMBER_TOKEN = r'[0-9@#.\-,E+]'
 
@@ -326,6 +725,10 @@ SUFFIX_PATTERN = r"(?P<suffix>.*)"
 number_re = re.compile(r"%s%s%s" % (PREFIX_PATTERN, NUMBER_PATTERN,
                                     SUFFIX_PATTERN))
 
+#: Parsed `NumberPattern` objects, keyed by pattern string
+_pattern_cache = {}
+_PATTERN_CACHE_SIZE = 1000
+
 def split_number(value):
     """Convert a number into a (intasstring, fractionasstring) tuple"""
     if isinstance(value, Decimal):
@@ -388,36 +791,110 @@ def bankersround(value, ndigits=0):
     >>> bankersround(1234.0, -2)
     1200.0
     """
-    sign = int(value < 0) and -1 or 1
-    value = abs(value)
-    a, b = split_number(value)
-    digits = a + b
-    add = 0
-    i = len(a) + ndigits
-    if i < 0 or i >= len(digits):
-        pass
-    elif digits[i] > '5':
-        add = 1
-    elif digits[i] == '5' and digits[i-1] in '13579':
-        add = 1
-    elif digits[i] == '5':     # previous digit is even
-        # We round up unless all following digits are zero.
-        for j in xrange(i + 1, len(digits)):
-            if digits[j] != '0':
-                add = 1
-                break
-
-    scale = 10**ndigits
+    negative, scaled = _round_half_even(value, ndigits)
     if isinstance(value, Decimal):
-        return Decimal(int(value * scale + add)) / scale * sign
-    else:
-        return float(int(value * scale + add)) / scale * sign
+        return Decimal((negative, tuple(map(int, scaled)), -ndigits))
+    sign = negative and -1 or 1
+    return float(int(scaled)) / 10**ndigits * sign
+
+def _round_half_even(value, ndigits):
+    """Round a number to `ndigits` fraction digits using the round-half-even
+    algorithm, and return a ``(negative, scaled)`` tuple, where `scaled` is
+    a string of the digits of the absolute value of the rounded number times
+    ``10 ** ndigits``.
+
+    The rounding is done on the exact digits of the number, and takes time
+    linear in the number of digits. Floats are rounded based on their
+    representation with nine fraction digits.
+
+    >>> _round_half_even(Decimal('-2.675'), 2) == (1, '268')
+    True
+    >>> _round_half_even(Decimal('0.0099'), 2) == (0, '1')
+    True
+    >>> _round_half_even(1250, -2) == (0, '12')
+    True
+    """
+    if isinstance(value, float):
+        value = Decimal('%.9f' % value)
+    if not isinstance(value, Decimal):
+        negative, value = int(value < 0), abs(value)
+        if ndigits >= 0:
+            return negative, '%d' % (value * 10 ** ndigits)
+        scaled, remainder = divmod(value, 10 ** -ndigits)
+        half = 5 * 10 ** (-ndigits - 1)
+        if remainder > half or (remainder == half and scaled & 1):
+            scaled += 1
+        return negative, '%d' % scaled
+
+    negative, digits, exp = value.as_tuple()
+    shift = exp + ndigits
+    if shift >= 0:
+        scaled = ''.join(map(str, digits)).lstrip('0')
+        return negative, scaled and scaled + '0' * shift or '0'
+    drop = -shift
+    if len(digits) <= drop:
+        digits = (0,) * (drop + 1 - len(digits)) + digits
+    cut = len(digits) - drop
+    scaled = ''.join(map(str, digits[:cut]))
+    first = digits[cut]
+    if first > 5 or first == 5 and (scaled[-1] in '13579' or
+                                    any(digits[cut + 1:])):
+        # add one, carrying over any trailing nines
+        head = scaled.rstrip('9')
+        nines = len(scaled) - len(head)
+        if head:
+            head = head[:-1] + '%d' % (int(head[-1]) + 1)
+        scaled = (head or '1') + '0' * nines
+    return negative, scaled.lstrip('0') or '0'
+
+def _split_rounded(value, ndigits):
+    """Round the absolute value of a number to `ndigits` fraction digits, and
+    return its integer and fraction digits as a tuple of strings.
+
+    >>> _split_rounded(Decimal('-2.675'), 2) == ('2', '68')
+    True
+    >>> _split_rounded(123456, -3) == ('123000', '')
+    True
+    """
+    scaled = _round_half_even(value, ndigits)[1]
+    if ndigits <= 0:
+        if scaled == '0':
+            return '0', ''
+        return scaled + '0' * -ndigits, ''
+    text = scaled.zfill(ndigits + 1)
+    return text[:-ndigits], text[-ndigits:]
+
+def _shift(value, places):
+    """Multiply a `Decimal` by ``10 ** places``, without any rounding.
+
+    >>> _shift(Decimal('1.25'), 3)
+    Decimal('1.25E+3')
+    """
+    sign, digits, exp = value.as_tuple()
+    return Decimal((sign, digits, exp + places))
 
 def parse_pattern(pattern):
-    """Parse number format patterns"""
+    """Parse number format patterns.
+
+    The parsed patterns are cached, so parsing the same pattern string again
+    returns the same object:
+
+    >>> parse_pattern('#,##0.00') is parse_pattern('#,##0.00')
+    True
+    """
     if isinstance(pattern, NumberPattern):
         return pattern
+    try:
+        return _pattern_cache[pattern]
+    except KeyError:
+        pass
+    parsed = _parse_pattern(pattern)
+    if len(_pattern_cache) >= _PATTERN_CACHE_SIZE:
+        _pattern_cache.clear()
+    _pattern_cache[pattern] = parsed
+    return parsed
 
+def _parse_pattern(pattern):
     # Do we have a negative subpattern?
     if ';' in pattern:
         pattern, neg_pattern = pattern.split(';', 1)
@@ -518,14 +995,25 @@ class NumberPattern(object):
         return '<%s %s>' % (type(self).__name__, pattern)
 
     def apply(self, value, locale, currency=None):
+        return _get_number_formatter(Locale.parse(locale), self,
+                                     currency).format(value)
+
+    def _format_number(self, value, symbols):
+        """Format a number without the prefix and suffix of the pattern,
+        and return a ``(is_negative, text)`` tuple.
+
+        :param symbols: the number symbols of the locale, as returned by
+                        `_get_number_symbols`
+        """
         if isinstance(value, float):
             value = Decimal(str(value))
-        value *= self.scale
+        if self.scale != 1:
+            value *= self.scale
         is_negative = int(value < 0)
         if self.exp_prec: # Scientific notation
-            value = abs(value)
+            value = Decimal(value).copy_abs()
             if value:
-                exp = int(math.floor(math.log(value, 10)))
+                exp = value.adjusted()
             else:
                 exp = 0
             # Minimum number of integer digits
@@ -533,66 +1021,60 @@ class NumberPattern(object):
                 exp -= self.int_prec[0] - 1
             # Exponent grouping
             elif self.int_prec[1]:
-                exp = int(exp) // self.int_prec[1] * self.int_prec[1]
-            if not isinstance(value, Decimal):
-                value = float(value)
-            if exp < 0:
-                value = value * 10**(-exp)
-            else:
-                value = value / 10**exp
+                exp = exp // self.int_prec[1] * self.int_prec[1]
+            value = _shift(value, -exp)
             exp_sign = ''
             if exp < 0:
-                exp_sign = get_minus_sign_symbol(locale)
+                exp_sign = symbols['minusSign']
             elif self.exp_plus:
-                exp_sign = get_plus_sign_symbol(locale)
+                exp_sign = symbols['plusSign']
             exp = abs(exp)
             number = '%s%s%s%s' % \
                  (self._format_sigdig(value, self.frac_prec[0],
                                      self.frac_prec[1]),
-                  get_exponential_symbol(locale),  exp_sign,
+                  symbols['exponential'],  exp_sign,
                   self._format_int(str(exp), self.exp_prec[0],
-                                   self.exp_prec[1], locale))
+                                   self.exp_prec[1], symbols['group']))
         elif '@' in self.pattern: # Is it a siginificant digits pattern?
-            text = self._format_sigdig(abs(value),
+            text = self._format_sigdig(Decimal(value).copy_abs(),
                                       self.int_prec[0],
                                       self.int_prec[1])
             if '.' in text:
                 a, b = text.split('.')
-                a = self._format_int(a, 0, 1000, locale)
+                a = self._format_int(a, 0, 1000, symbols['group'])
                 if b:
-                    b = get_decimal_symbol(locale) + b
+                    b = symbols['decimal'] + b
                 number = a + b
             else:
-                number = self._format_int(text, 0, 1000, locale)
+                number = self._format_int(text, 0, 1000, symbols['group'])
+        elif isinstance(value, integer_types): # An integer needs no rounding
+            number = self._format_int('%d' % abs(value), self.int_prec[0],
+                                      self.int_prec[1], symbols['group'])
+            if self.frac_prec[0]:
+                number += symbols['decimal'] + '0' * self.frac_prec[0]
         else: # A normal number pattern
-            a, b = split_number(bankersround(abs(value),
-                                             self.frac_prec[1]))
+            a, b = _split_rounded(value, self.frac_prec[1])
             b = b or '0'
             a = self._format_int(a, self.int_prec[0],
-                                 self.int_prec[1], locale)
-            b = self._format_frac(b, locale)
+                                 self.int_prec[1], symbols['group'])
+            b = self._format_frac(b, symbols['decimal'])
             number = a + b
-        retval = '%s%s%s' % (self.prefix[is_negative], number,
-                                self.suffix[is_negative])
-        if '\xa4' in retval:
-            retval = retval.replace('\xa4\xa4', currency.upper())
-            retval = retval.replace('\xa4', get_currency_symbol(currency, locale))
-        return retval
+        return is_negative, number
 
     def _format_sigdig(self, value, min, max):
-        """Convert value to a string.
+        """Convert a positive `Decimal` value to a string.
 
         The resulting string will contain between (min, max) number of
         significant digits.
         """
-        a, b = split_number(value)
-        ndecimals = len(a)
-        if a == '0' and b != '':
-            ndecimals = 0
-            while b.startswith('0'):
-                b = b[1:]
-                ndecimals -= 1
-        a, b = split_number(bankersround(value, max - ndecimals))
+        # the position of the most significant digit, relative to the
+        # decimal point
+        if value:
+            ndecimals = value.adjusted() + 1
+        else:
+            ndecimals = 1
+        a, b = _split_rounded(value, max - ndecimals)
+        b = b.rstrip('0')
         digits = len((a + b).lstrip('0'))
         if not digits:
             digits = 1
@@ -605,20 +1087,25 @@ class NumberPattern(object):
             return '%s.%s' % (a, b)
         return a
 
-    def _format_int(self, value, min, max, locale):
+    def _format_int(self, value, min, max, symbol):
         width = len(value)
         if width < min:
             value = '0' * (min - width) + value
-        gsize = self.grouping[0]
-        ret = ''
-        symbol = get_group_symbol(locale)
-        while len(value) > gsize:
-            ret = symbol + value[-gsize:] + ret
-            value = value[:-gsize]
-            gsize = self.grouping[1]
-        return value + ret
-
-    def _format_frac(self, value, locale):
+            width = min
+        primary, secondary = self.grouping
+        if width <= primary:
+            return value
+        # The last group has the primary size, all the groups before it the
+        # secondary size, except for the first one, which may be shorter
+        end = width - primary
+        start = end % secondary or secondary
+        groups = [value[:start]]
+        groups.extend([value[idx:idx + secondary]
+                       for idx in xrange(start, end, secondary)])
+        groups.append(value[end:])
+        return symbol.join(groups)
+
+    def _format_frac(self, value, symbol):
         min, max = self.frac_prec
         if len(value) < min:
             value += ('0' * (min - len(value)))
@@ -627,4 +1114,99 @@ class NumberPattern(object):
         width = len(value)
         while len(value) > min and value[-1] == '0':
             value = value[:-1]
-        return get_decimal_symbol(locale) + value
+        return symbol + value
+
+
+class NumberFormatter(object):
+    """Formatter of numbers with a given pattern, for a specific locale.
+
+    The number symbols of the locale, and the prefixes and suffixes of the
+    pattern with any currency symbol filled in, are looked up only once when
+    the formatter is created, so formatting many numbers with the same
+    formatter is faster than calling `format_decimal` and friends for each
+    of them.
+
+    >>> formatter = NumberFormatter('de_DE', '#,##0.00')
+    >>> formatter.format(1099.98) == '1.099,98'
+    True
+    >>> formatter.format(-4) == '-4,00'
+    True
+    >>> formatter = NumberFormatter('en_US', '\xa4#,##0.00', currency='EUR')
+    >>> formatter.format(1099.98) == '\u20ac1,099.98'
+    True
+    >>> formatter = NumberFormatter('en_US', '\xa4#,##0.00', currency='JPY',
+    ...                             currency_digits=True)
+    >>> formatter.format(1099.98) == '\xa51,100'
+    True
+
+    :since: version 1.0
+    """
+
+    def __init__(self, locale, pattern, currency=None, currency_digits=False):
+        """Create the formatter.
+
+        :param locale: the `Locale` object or locale identifier
+        :param pattern: the format pattern, as a string or `NumberPattern`
+        :param currency: the currency code, for currency patterns
+        :param currency_digits: whether to use the number of fraction digits
+                                of the currency instead of those of the
+                                pattern
+        """
+        self.locale = Locale.parse(locale)
+        self.pattern = parse_pattern(pattern)
+        self.currency = currency
+        if currency and currency_digits:
+            digits = get_currency_precision(currency)
+            if self.pattern.frac_prec != (digits, digits):
+                # parsed patterns are shared, so change a copy
+                self.pattern = copy.copy(self.pattern)
+                self.pattern.frac_prec = (digits, digits)
+        self.symbols = _get_number_symbols(self.locale)
+        self.prefix = tuple([self._fill_currency(text)
+                             for text in self.pattern.prefix])
+        self.suffix = tuple([self._fill_currency(text)
+                             for text in self.pattern.suffix])
+
+    def _fill_currency(self, text):
+        if '\xa4' in text:
+            text = text.replace('\xa4\xa4', self.currency.upper())
+            text = text.replace('\xa4', get_currency_symbol(self.currency,
+                                                            self.locale))
+        return text
+
+    def format(self, value):
+        """Return the given number formatted with the pattern.
+
+        :param value: the number to format
+        :return: the formatted number
+        :rtype: `unicode`
+        """
+        is_negative, number = self.pattern._format_number(value, self.symbols)
+        return self.prefix[is_negative] + number + self.suffix[is_negative]
+
+
+#: `NumberFormatter` objects, keyed by locale, `NumberPattern` and currency
+#: code
+_number_formatters = {}
+
+def _get_number_formatter(locale, pattern, currency):
+    key = (locale, pattern, currency)
+    try:
+        return _number_formatters[key]
+    except KeyError:
+        pass
+    formatter = NumberFormatter(locale, pattern, currency)
+    if len(_number_formatters) >= _PATTERN_CACHE_SIZE:
+        _number_formatters.clear()
+    _number_formatters[key] = formatter
+    return formatter
+
+def _get_number_symbols(locale):
+    symbols = dict(locale.number_symbols.items())
+    return {
+        'decimal': symbols.get('decimal', '.'),
+        'group': symbols.get('group', ','),
+        'plusSign': symbols.get('plusSign', '+'),
+        'minusSign': symbols.get('minusSign', '-'),
+        'exponential': symbols.get('exponential', 'E')
+    }
@@ -13,9 +13,10 @@
 
 import doctest
 import os
+import pickle
 import unittest
 
-from babel import core
+from babel import core, localedata
 from babel.core import default_locale, Locale, UnknownLocaleError
 
 class DefaultLocaleTest(unittest.TestCase):
@@ -47,10 +48,92 @@ class DefaultLocaleTest(unittest.TestCase):
         self.assertRaises(UnknownLocaleError, Locale.parse, 'en_DE')
 
 
+class LocaleCacheTest(unittest.TestCase):
+
+    def test_parse_returns_shared_instance(self):
+        locale = Locale.parse('en_US')
+        self.assertTrue(Locale.parse('en_US') is locale)
+        self.assertTrue(Locale.parse('en-US', sep='-') is locale)
+        self.assertTrue(Locale('en', 'US') is locale)
+
+    def test_hashable(self):
+        locales = {Locale('de', 'DE'): 1}
+        self.assertEqual(1, locales[Locale.parse('de_DE')])
+
+    def test_immutable(self):
+        locale = Locale('de', 'DE')
+        self.assertRaises(AttributeError, setattr, locale, 'language', 'fr')
+        self.assertEqual('de', locale.language)
+
+    def test_pickle(self):
+        locale = Locale('de', 'DE')
+        self.assertTrue(pickle.loads(pickle.dumps(locale, 2)) is locale)
+
+    def test_unknown_is_cached(self):
+        self.assertRaises(UnknownLocaleError, Locale.parse, 'xx_XX')
+        self.assertTrue('xx_XX' in core._unknown_locales)
+        self.assertRaises(UnknownLocaleError, Locale.parse, 'xx_XX')
+
+    def test_data_reused_while_cached(self):
+        locale = Locale('de', 'DE')
+        data = locale._data
+        hits = localedata.cache_info()['hits']
+        self.assertTrue(locale._data is data)
+        locale.number_symbols
+        self.assertEqual(hits, localedata.cache_info()['hits'])
+
+    def test_data_reloaded_after_eviction(self):
+        locale = Locale('de', 'DE')
+        data = locale._data
+        localedata._cache_lock.acquire()
+        try:
+            cached = localedata._cache.pop('de_DE')
+        finally:
+            localedata._cache_lock.release()
+        try:
+            self.assertFalse(locale._data is data)
+            self.assertEqual(',', locale.number_symbols['decimal'])
+        finally:
+            localedata._cache_lock.acquire()
+            try:
+                localedata._cache.setdefault('de_DE', cached)
+            finally:
+                localedata._cache_lock.release()
+
+
+class GlobalDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self._global_data = core._global_data
+        core._global_data = None
+
+    def tearDown(self):
+        core._global_data = self._global_data
+
+    def test_concurrent_first_access(self):
+        from babel.compat import threading
+        results = []
+        def worker():
+            results.append(core.get_global('zone_territories'))
+        threads = [threading.Thread(target=worker) for idx in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(8, len(results))
+        for result in results:
+            self.assertTrue(result is results[0])
+
+    def test_unknown_key(self):
+        self.assertEqual({}, core.get_global('no_such_key'))
+
+
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(doctest.DocTestSuite(core))
     suite.addTest(unittest.makeSuite(DefaultLocaleTest))
+    suite.addTest(unittest.makeSuite(LocaleCacheTest))
+    suite.addTest(unittest.makeSuite(GlobalDataTest))
     return suite
 
 if __name__ == '__main__':
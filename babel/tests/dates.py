@@ -20,6 +20,7 @@ import unittest
 from pytz import timezone
 
 from babel import dates
+from babel.core import Locale
 from babel.util import FixedOffsetTimezone
 
 
@@ -250,6 +251,210 @@ class FormatTimeTestCase(unittest.TestCase):
                           "yyyy-MM-dd HH:mm", locale='en_US')
 
 
+class FormatDatetimeTestCase(unittest.TestCase):
+
+    def test_standard_format_same_as_date_and_time(self):
+        dt = datetime(2007, 4, 1, 15, 30, tzinfo=timezone('UTC'))
+        for format in ('full', 'long', 'medium', 'short'):
+            expected = dates.get_datetime_format(format, locale='de_DE') \
+                .replace('{0}', dates.format_time(dt, format, locale='de_DE')) \
+                .replace('{1}', dates.format_date(dt, format, locale='de_DE'))
+            self.assertEqual(expected,
+                             dates.format_datetime(dt, format,
+                                                   locale='de_DE'))
+
+    def test_standard_format_pattern_cached(self):
+        dates.format_datetime(datetime(2007, 4, 1), 'short', locale='en_US')
+        locale = Locale.parse('en_US')
+        pattern = dates._datetime_patterns[(locale, 'short')]
+        self.assertTrue(dates._get_datetime_pattern('short', locale)
+                        is pattern)
+
+
+    def test_many_same_as_single(self):
+        tzinfo = timezone('Europe/Paris')
+        values = [datetime(2007, 4, 1, 15, 30), datetime(2012, 12, 31, 23, 59),
+                  datetime(2007, 4, 1, 15, 30, tzinfo=timezone('US/Eastern')),
+                  0, 1175441400.5]
+        for format in ('full', 'short', "EEE, d MMM yyyy HH:mm:ss Z"):
+            self.assertEqual([dates.format_datetime(value, format,
+                                                    tzinfo=tzinfo,
+                                                    locale='fr_FR')
+                              for value in values],
+                             dates.format_datetime_many(values, format,
+                                                        tzinfo=tzinfo,
+                                                        locale='fr_FR'))
+
+    def test_many_arrays(self):
+        from array import array
+        self.assertEqual(['1970-01-01 00:00', '2007-04-01 15:30'],
+                         dates.format_datetime_many(
+                             array(str('d'), [0, 1175441400]),
+                             'yyyy-MM-dd HH:mm', locale='en_US'))
+        self.assertEqual([], dates.format_datetime_many(iter([]),
+                                                        locale='en_US'))
+
+    def test_many_datetime64_array(self):
+        # the interface of NumPy datetime64 arrays used by the function
+        class DatetimeType(object):
+            kind = 'M'
+        class DatetimeArray(object):
+            dtype = DatetimeType()
+            def __init__(self, items, unit='ns'):
+                self.items = items
+                self.unit = unit
+            def astype(self, type):
+                return DatetimeArray(self.items, type[11:-1])
+            def tolist(self):
+                if self.unit != 'us': # items would be integers
+                    raise AssertionError('not converted to microseconds')
+                return list(self.items)
+        values = DatetimeArray([datetime(2007, 4, 1, 15, 30)])
+        self.assertEqual(['2007-04-01 15:30'],
+                         dates.format_datetime_many(values, 'yyyy-MM-dd HH:mm',
+                                                    locale='en_US'))
+        values = DatetimeArray([datetime(2007, 4, 1, 15, 30), None])
+        self.assertRaises(ValueError, dates.format_datetime_many, values,
+                          locale='en_US')
+
+    def test_many_numpy_datetime64(self):
+        try:
+            import numpy
+        except ImportError:
+            return
+        values = numpy.array(['2007-04-01T15:30:00', '1970-01-01T00:00:00'],
+                             dtype='datetime64[ns]')
+        self.assertEqual(['2007-04-01 15:30', '1970-01-01 00:00'],
+                         dates.format_datetime_many(values, 'yyyy-MM-dd HH:mm',
+                                                    locale='en_US'))
+        values = numpy.array(['2007-04-01T15:30:00', 'NaT'],
+                             dtype='datetime64[ns]')
+        self.assertRaises(ValueError, dates.format_datetime_many, values,
+                          locale='en_US')
+
+
+class ParsePatternTestCase(unittest.TestCase):
+
+    def test_cached(self):
+        pattern = dates.parse_pattern("H:mm' Uhr 'z")
+        self.assertTrue(dates.parse_pattern("H:mm' Uhr 'z") is pattern)
+        self.assertTrue(dates.parse_pattern(pattern) is pattern)
+
+    def test_cache_bounded(self):
+        for idx in range(dates._PATTERN_CACHE_SIZE + 1):
+            dates.parse_pattern("'%d' HH:mm" % idx)
+        self.assertTrue(len(dates._pattern_cache) <=
+                        dates._PATTERN_CACHE_SIZE)
+
+
+class DateTimePatternTestCase(unittest.TestCase):
+
+    def test_apply_same_as_datetime_format(self):
+        d = datetime(2007, 4, 1, 15, 30, 5, tzinfo=timezone('UTC'))
+        for pattern in ('GGGG y yy QQQ qqqq MMMMM LLL d', 'EEEE e c ccc',
+                        'a h hh H K k mm ss', 'w W D F YYYY SSS A z'):
+            pattern = dates.parse_pattern(pattern)
+            self.assertEqual(pattern % dates.DateTimeFormat(d, 'de_DE'),
+                             pattern.apply(d, 'de_DE'))
+
+    def test_apply_literals(self):
+        pattern = dates.parse_pattern("'100%' h 'o''clock' '%(a)s'")
+        self.assertEqual("100% 3 o'clock %(a)s",
+                         pattern.apply(time(15, 30), 'en_US'))
+
+    def test_compiled_once_per_locale(self):
+        pattern = dates.parse_pattern('d MMMM')
+        pattern.apply(date(2007, 4, 1), 'fr_FR')
+        key = (pattern.format, Locale.parse('fr_FR'))
+        compiled = dates._compiled_patterns[key]
+        pattern.apply(date(2007, 5, 1), 'fr_FR')
+        self.assertTrue(dates._compiled_patterns[key] is compiled)
+        self.assertEqual('1 avril', pattern.apply(date(2007, 4, 1), 'fr_FR'))
+        self.assertEqual('1 April', pattern.apply(date(2007, 4, 1), 'de_DE'))
+
+    def test_time_fields_with_date(self):
+        pattern = dates.parse_pattern('HH:mm')
+        self.assertRaises(AttributeError, pattern.apply, date(2007, 4, 1),
+                          'en_US')
+
+
+class TimezoneNameTestCase(unittest.TestCase):
+
+    def test_cached_by_kind_of_time(self):
+        tz = timezone('America/Los_Angeles')
+        winter = tz.localize(datetime(2007, 1, 15, 12, 0))
+        summer = tz.localize(datetime(2007, 7, 15, 12, 0))
+        for idx in range(2):
+            self.assertEqual('Pacific Standard Time',
+                             dates.get_timezone_name(winter, locale='en_US'))
+            self.assertEqual('Pacific Daylight Time',
+                             dates.get_timezone_name(summer, locale='en_US'))
+            self.assertEqual('Pacific Time',
+                             dates.get_timezone_name(tz, locale='en_US'))
+        locale = Locale.parse('en_US')
+        self.assertEqual('Pacific Daylight Time', dates._timezone_names[
+            ('America/Los_Angeles', 'long', 'daylight', False, locale)])
+
+    def test_gmt_fallback_not_cached(self):
+        tz = timezone('Asia/Tokyo')
+        dt = tz.localize(datetime(2007, 4, 1, 15, 30))
+        self.assertEqual('GMT+09:00',
+                         dates.get_timezone_name(dt, locale='de_DE'))
+        dt = datetime(2007, 4, 1, 15, 30,
+                      tzinfo=FixedOffsetTimezone(90, 'Asia/Tokyo'))
+        self.assertEqual('GMT+01:30',
+                         dates.get_timezone_name(dt, locale='de_DE'))
+
+    def test_location_cached(self):
+        tz = timezone('America/St_Johns')
+        self.assertEqual("Kanada (St. John's)",
+                         dates.get_timezone_location(tz, locale='de_DE'))
+        locale = Locale.parse('de_DE')
+        self.assertEqual("Kanada (St. John's)", dates._timezone_locations[
+            ('America/St_Johns', locale)])
+
+
+class TimezoneConversionTestCase(unittest.TestCase):
+
+    def test_same_as_pytz(self):
+        tz = timezone('America/New_York')
+        utc = timezone('UTC')
+        start = datetime(2007, 3, 11, 6, 0, tzinfo=utc)
+        values = [start + timedelta(minutes=minutes)
+                  for minutes in range(-60, 24 * 60 * 240, 59)]
+        # sorted, then in reverse, to move between intervals both ways
+        for value in values + values[::-1]:
+            expected = tz.normalize(value.astimezone(tz))
+            converted = dates._astimezone(value, tz)
+            self.assertEqual(expected, converted)
+            self.assertTrue(expected.tzinfo is converted.tzinfo)
+
+    def test_local_datetime(self):
+        berlin = timezone('Europe/Berlin')
+        dt = timezone('US/Eastern').localize(datetime(2007, 10, 27, 20, 30))
+        self.assertEqual('2007-10-28 02:30 MESZ',
+                         dates.format_datetime(dt, 'yyyy-MM-dd HH:mm z',
+                                               tzinfo=berlin, locale='de_DE'))
+        dt = timezone('US/Eastern').localize(datetime(2007, 10, 27, 21, 30))
+        self.assertEqual('2007-10-28 02:30 MEZ',
+                         dates.format_datetime(dt, 'yyyy-MM-dd HH:mm z',
+                                               tzinfo=berlin, locale='de_DE'))
+
+    def test_gmt_negative_partial_hours(self):
+        dt = datetime(2007, 4, 1, 15, 30,
+                      tzinfo=FixedOffsetTimezone(-90, 'Etc/Test'))
+        self.assertEqual('GMT-01:30', dates.get_timezone_gmt(dt, locale='en'))
+        self.assertEqual('-0130',
+                         dates.get_timezone_gmt(dt, 'short', locale='en'))
+
+    def test_gmt_cached(self):
+        dt = datetime(2007, 4, 1, 15, 30, tzinfo=FixedOffsetTimezone(345))
+        self.assertEqual('UTC+05:45',
+                         dates.get_timezone_gmt(dt, locale='fr_FR'))
+        self.assertEqual('UTC+05:45', dates._timezone_gmt_offsets[
+            (345 * 60, 'long', Locale.parse('fr_FR'))])
+
+
 class FormatTimedeltaTestCase(unittest.TestCase):
 
     def test_zero_seconds(self):
@@ -294,6 +499,11 @@ def suite():
     suite.addTest(unittest.makeSuite(DateTimeFormatTestCase))
     suite.addTest(unittest.makeSuite(FormatDateTestCase))
     suite.addTest(unittest.makeSuite(FormatTimeTestCase))
+    suite.addTest(unittest.makeSuite(FormatDatetimeTestCase))
+    suite.addTest(unittest.makeSuite(ParsePatternTestCase))
+    suite.addTest(unittest.makeSuite(DateTimePatternTestCase))
+    suite.addTest(unittest.makeSuite(TimezoneNameTestCase))
+    suite.addTest(unittest.makeSuite(TimezoneConversionTestCase))
     suite.addTest(unittest.makeSuite(FormatTimedeltaTestCase))
     suite.addTest(unittest.makeSuite(TimeZoneAdjustTestCase))
     return suite
@@ -12,9 +12,13 @@
 # history and logs, available at http://babel.edgewall.org/log/.
 
 import doctest
+import os
+import shutil
+import tempfile
 import unittest
 
 from babel import localedata
+from babel.compat import pickle
 
 
 class MergeResolveTestCase(unittest.TestCase):
@@ -63,10 +67,277 @@ class MergeResolveTestCase(unittest.TestCase):
         }, dict(d.items()))
 
 
+class ChainedLocaleDataTestCase(unittest.TestCase):
+
+    def test_lookup_order(self):
+        d = localedata.ChainedLocaleData([{1: 'Foo', 2: None},
+                                          {1: 'foo', 2: 'bar'}])
+        self.assertEqual('Foo', d[1])
+        self.assertEqual('bar', d[2])
+        self.assertRaises(KeyError, d.__getitem__, 3)
+        self.assertEqual(set([1, 2]), set(d))
+
+    def test_nested_dicts_not_copied(self):
+        child = {'x': {'b': 12, 'd': 14}}
+        parent = {'x': {'a': 1, 'b': 2, 'c': 3}}
+        d = localedata.ChainedLocaleData([child, parent])
+        self.assertEqual({'a': 1, 'b': 12, 'c': 3, 'd': 14},
+                         dict(d['x'].items()))
+        self.assertEqual([child['x'], parent['x']], d['x'].maps)
+
+    def test_set_does_not_modify_maps(self):
+        parent = {'x': {'a': 1}}
+        d = localedata.ChainedLocaleData([{}, parent])
+        d['x']['a'] = 2
+        d['y'] = 3
+        self.assertEqual(2, d['x']['a'])
+        self.assertEqual(3, d['y'])
+        self.assertEqual({'x': {'a': 1}}, parent)
+
+    def test_chain_with_alias_and_resolve(self):
+        alias = localedata.Alias('x')
+        d1 = {
+            'x': {'a': 1, 'b': 2, 'c': 3},
+            'y': alias
+        }
+        d2 = {
+            'x': {'a': 1, 'b': 12, 'd': 14},
+            'y': {'b': 22, 'e': 25}
+        }
+        d = localedata.LocaleDataDict(localedata.ChainedLocaleData([d2, d1]))
+        self.assertEqual({'a': 1, 'b': 12, 'c': 3, 'd': 14},
+                         dict(d['x'].items()))
+        self.assertEqual({'a': 1, 'b': 22, 'c': 3, 'd': 14, 'e': 25},
+                         dict(d['y'].items()))
+        self.assertTrue(d1['y'] is alias)
+
+    def test_chain_with_alias_merges_nested_dicts(self):
+        parent = {'x': {'a': {'p': 1, 'q': 2}}, 'y': localedata.Alias(['x'])}
+        child = {'y': {'a': {'q': 3}}}
+        d = localedata.LocaleDataDict(localedata.ChainedLocaleData([child,
+                                                                    parent]))
+        self.assertEqual({'p': 1, 'q': 3}, dict(d['y']['a'].items()))
+        self.assertEqual({'p': 1, 'q': 2}, dict(d['x']['a'].items()))
+        self.assertEqual({'a': {'p': 1, 'q': 2}}, parent['x'])
+
+
+class MappedLocaleDataTestCase(unittest.TestCase):
+    cls = localedata.MappedLocaleData
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def _dump(self, name, data):
+        filename = os.path.join(self.dirname, name + '.mdat')
+        fileobj = open(filename, 'wb')
+        try:
+            localedata.dump_sectioned(data, fileobj)
+        finally:
+            fileobj.close()
+        return filename
+
+    def test_load_sections(self):
+        filename = self._dump('xx', {'a': {1: 'one'}, 'b': 'bee'})
+        data = self.cls(filename)
+        self.assertEqual(set(['a', 'b']), set(data))
+        self.assertEqual({1: 'one'}, data['a'])
+        self.assertEqual('bee', data['b'])
+        self.assertRaises(KeyError, data.__getitem__, 'c')
+
+    def test_chain_parent(self):
+        parent = self.cls(self._dump('xx', {
+            'x': {'a': 1, 'b': 2}, 'y': localedata.Alias(['x']), 'z': 'zed'
+        }))
+        child = self.cls(self._dump('xx_YY', {
+            'x': {'b': 12}, 'y': {'c': 3}
+        }))
+        d = localedata.LocaleDataDict(
+            localedata.ChainedLocaleData([child, parent]))
+        self.assertEqual({'a': 1, 'b': 12}, dict(d['x'].items()))
+        self.assertEqual({'a': 1, 'b': 12, 'c': 3}, dict(d['y'].items()))
+        self.assertEqual('zed', d['z'])
+        self.assertEqual({'a': 1, 'b': 2}, parent['x'])
+
+
+class SectionedLocaleDataTestCase(MappedLocaleDataTestCase):
+    cls = localedata.SectionedLocaleData
+
+    def test_load_single_section(self):
+        filename = self._dump('xx', {'a': 'ay', 'b': 'bee'})
+        data = self.cls(filename)
+        self.assertEqual('ay', data['a'])
+        self.assertEqual(['a'], list(data._values))
+
+
+class FlattenTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.saved = (localedata._dirname, localedata._index,
+                      localedata._backend)
+        localedata._dirname = self.dirname
+        localedata._backend = 'pickle'
+        localedata._index = {'parents': {'xx': 'root'},
+                             'files': {'.dat': {'xx': 1}}, 'flat': True}
+
+    def tearDown(self):
+        localedata._dirname, localedata._index, localedata._backend = \
+                self.saved
+        localedata._cache.pop('xx', None)
+        shutil.rmtree(self.dirname)
+
+    def test_flatten(self):
+        data = {'x': {'a': 1}, 'y': localedata.Alias(['z']),
+                'z': localedata.Alias(['x'])}
+        flat = localedata.flatten(data)
+        self.assertEqual({'a': 1}, flat['y'])
+        self.assertTrue(type(flat['x']) is dict)
+        self.assertTrue(isinstance(data['y'], localedata.Alias))
+
+    def test_load_flat(self):
+        fileobj = open(os.path.join(self.dirname, 'xx.dat'), 'wb')
+        try:
+            pickle.dump({'x': {'a': 1}}, fileobj, 2)
+        finally:
+            fileobj.close()
+        data = localedata.load('xx')
+        self.assertEqual({'x': {'a': 1}}, data)
+        self.assertTrue(localedata.load('xx', merge_inherited=False) is data)
+
+
+class CachePolicyTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        localedata.set_cache_policy()
+
+    def test_max_locales(self):
+        localedata.set_cache_policy(max_locales=4)
+        for name in ('de_DE', 'fr_FR', 'it_IT', 'en'):
+            localedata.load(name)
+        self.assertTrue(len(localedata._cache) <= 4)
+        # root and en are pinned by default
+        for name in ('root', 'en', 'it', 'it_IT'):
+            self.assertTrue(name in localedata._cache)
+        self.assertFalse('de_DE' in localedata._cache)
+
+    def test_parents_not_evicted(self):
+        localedata.set_cache_policy(max_locales=1, pinned=())
+        localedata.load('de_AT')
+        for name in ('de_AT', 'de', 'root'):
+            self.assertTrue(name in localedata._cache)
+
+    def test_stats(self):
+        before = localedata.cache_info()
+        localedata.load('sv_SE')
+        localedata.load('sv_SE')
+        after = localedata.cache_info()
+        self.assertTrue(after['hits'] > before['hits'])
+        self.assertEqual(after['locales'], len(localedata._cache))
+        localedata.set_cache_policy(max_bytes=0)
+        after = localedata.cache_info()
+        self.assertTrue(after['evictions'] > before['evictions'])
+        self.assertFalse('sv_SE' in localedata._cache)
+
+
+class ConcurrentLoadTestCase(unittest.TestCase):
+
+    def test_concurrent_loads(self):
+        from babel.compat import threading
+        names = ['ja_JP', 'ko_KR', 'zh_Hant_TW', 'ja_JP', 'ko_KR', 'pt_BR']
+        results = [None] * len(names)
+        def worker(idx):
+            results[idx] = localedata.load(names[idx])
+        threads = [threading.Thread(target=worker, args=(idx,))
+                   for idx in range(len(names))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(results[0] is results[3])
+        self.assertTrue(results[1] is results[4])
+        for name, data in zip(names, results):
+            self.assertTrue(localedata.load(name) is data)
+        for name in names:
+            self.assertFalse(name in localedata._load_locks)
+
+    def test_no_locks_left_for_invalid_names(self):
+        for idx in range(10):
+            self.assertRaises(IOError, localedata.load, 'xx_%d' % idx)
+        self.assertFalse([name for name in localedata._load_locks
+                          if name.startswith('xx_')])
+
+
+class PreloadTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        localedata._preloaded.clear()
+        localedata.set_cache_policy()
+
+    def test_materialized(self):
+        localedata.preload(['pt_BR'])
+        data = localedata.load('pt_BR')
+        months = data._values['months']
+        self.assertTrue(isinstance(months, localedata.LocaleDataDict))
+        self.assertTrue('format' in months._data._values)
+
+    def test_not_evicted(self):
+        localedata.preload(['nl_BE'], resolve_aliases=False)
+        localedata.set_cache_policy(max_locales=1, pinned=())
+        localedata.load('sv_FI')
+        localedata.load('da_DK')
+        self.assertTrue('nl_BE' in localedata._cache)
+        self.assertFalse('sv_FI' in localedata._cache)
+
+
+class LocaleIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = localedata._index
+        sizes = {'root': 10, 'en': 20, 'en_XX': 30}
+        localedata._index = {
+            'parents': {'root': None, 'en': 'root', 'en_XX': 'en'},
+            'files': {'.dat': sizes, '.mdat': sizes}
+        }
+
+    def tearDown(self):
+        localedata._index = self.index
+
+    def test_locale_identifiers(self):
+        self.assertEqual(['en', 'en_XX'],
+                         sorted(localedata.locale_identifiers()))
+
+    def test_exists(self):
+        self.assertTrue(localedata.exists('en_XX'))
+        self.assertFalse(localedata.exists('en_YY'))
+
+    def test_parent_and_size(self):
+        self.assertEqual('en', localedata._parent('en_XX'))
+        self.assertEqual('de', localedata._parent('de_DE'))
+        self.assertEqual(30, localedata._size('en_XX'))
+
+    def test_without_index(self):
+        localedata._index = None
+        self.assertTrue(localedata.exists('en_US'))
+        self.assertFalse(localedata.exists('en_YY'))
+        self.assertTrue('de_DE' in localedata.locale_identifiers())
+        self.assertEqual('en', localedata._parent('en_US'))
+
+
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(doctest.DocTestSuite(localedata))
     suite.addTest(unittest.makeSuite(MergeResolveTestCase))
+    suite.addTest(unittest.makeSuite(ChainedLocaleDataTestCase))
+    suite.addTest(unittest.makeSuite(MappedLocaleDataTestCase))
+    suite.addTest(unittest.makeSuite(SectionedLocaleDataTestCase))
+    suite.addTest(unittest.makeSuite(FlattenTestCase))
+    suite.addTest(unittest.makeSuite(CachePolicyTestCase))
+    suite.addTest(unittest.makeSuite(ConcurrentLoadTestCase))
+    suite.addTest(unittest.makeSuite(PreloadTestCase))
+    suite.addTest(unittest.makeSuite(LocaleIndexTestCase))
     return suite
 
 if __name__ == '__main__':
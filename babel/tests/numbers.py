@@ -11,11 +11,15 @@
 # individuals. For the exact contribution history, see the revision
 # history and logs, available at http://babel.edgewall.org/log/.
 
+from __future__ import unicode_literals
+
 from decimal import Decimal
 import doctest
 import unittest
 
 from babel import numbers
+from babel.core import Locale
+from babel.plural import PluralRule
 
 
 class FormatDecimalTestCase(unittest.TestCase):
@@ -29,6 +33,50 @@ class FormatDecimalTestCase(unittest.TestCase):
                                                 '#.00', locale='en_US'),
                          '100000000000000000000.00')
 
+    def test_integers(self):
+        self.assertEqual(numbers.format_decimal(12345678901234567891,
+                                                '#,##0.00', locale='en_US'),
+                         '12,345,678,901,234,567,891.00')
+        self.assertEqual(numbers.format_decimal(-7, '000', locale='en_US'),
+                         '-007')
+        self.assertEqual(numbers.format_percent(3, locale='en_US'), '300%')
+
+    def test_grouping_long_numbers(self):
+        digits = '1234567890' * 50
+        self.assertEqual(numbers.format_decimal(Decimal(digits), '#,##0',
+                                                locale='en_US'),
+                         ','.join([digits[:2]] + [digits[idx:idx + 3]
+                                  for idx in range(2, 500, 3)]))
+        self.assertEqual(numbers.format_decimal(12345678, '#,##,##0',
+                                                locale='en_US'),
+                         '1,23,45,678')
+        self.assertEqual(numbers.format_decimal(123, '#,##,##0',
+                                                locale='en_US'), '123')
+        self.assertEqual(numbers.format_decimal(1234, '#,##,##0',
+                                                locale='en_US'), '1,234')
+
+    def test_scientific_notation_exact(self):
+        self.assertEqual('1E3', numbers.format_scientific(1000, '#E0',
+                                                          locale='en_US'))
+        self.assertEqual('1.0E400', numbers.format_scientific(
+            Decimal('1E+400'), '0.0E0', locale='en_US'))
+        self.assertEqual('-1.00E-300', numbers.format_scientific(
+            Decimal('-1E-300'), '0.00E0', locale='en_US'))
+        self.assertEqual('1.234567890123456789012345678901E0',
+                         numbers.format_scientific(
+                             Decimal('1.2345678901234567890123456789012345'),
+                             '0.000000000000000000000000000000E0',
+                             locale='en_US'))
+
+    def test_significant_digits_exact(self):
+        self.assertEqual('123456789012345678901234567890120',
+                         numbers.format_decimal(
+                             Decimal('123456789012345678901234567890123'),
+                             '@' * 32, locale='en_US'))
+        self.assertEqual('0.00000000000000000000000000000000000001234',
+                         numbers.format_decimal(Decimal('1.2345E-38'),
+                                                '@@@@', locale='en_US'))
+
     def test_subpatterns(self):
         self.assertEqual(numbers.format_decimal(-12345, '#,##0.##;-#',
                          locale='en_US'), '-12,345')
@@ -156,6 +204,290 @@ class BankersRoundTestCase(unittest.TestCase):
         self.assertEqual(0, numbers.bankersround(Decimal('0.05'), ndigits=1))
         self.assertEqual(Decimal('0.2'), numbers.bankersround(Decimal('0.15'), ndigits=1))
 
+    def test_exact_arithmetic(self):
+        self.assertEqual(0.29, numbers.bankersround(0.29, 2))
+        self.assertEqual(Decimal('1234567890123456789012345678.8'),
+                         numbers.bankersround(
+                             Decimal('1234567890123456789012345678.85'), 1))
+        self.assertEqual(Decimal('-1.2E+3'),
+                         numbers.bankersround(Decimal('-1250'), -2))
+
+    def test_format_long_numbers(self):
+        self.assertEqual('1234567890123456789012345678.90',
+                         numbers.format_decimal(
+                             Decimal('1234567890123456789012345678.895'),
+                             '0.00', locale='en_US'))
+        self.assertEqual('95300000',
+                         numbers.format_decimal(95273085, '@@@',
+                                                locale='en_US'))
+
+
+class ParsePatternTestCase(unittest.TestCase):
+
+    def test_cached(self):
+        pattern = numbers.parse_pattern('#,##0.00;(#)')
+        self.assertTrue(numbers.parse_pattern('#,##0.00;(#)') is pattern)
+        self.assertTrue(numbers.parse_pattern(pattern) is pattern)
+        self.assertEqual(('(', ')'), (pattern.prefix[1], pattern.suffix[1]))
+
+    def test_cache_bounded(self):
+        for idx in range(numbers._PATTERN_CACHE_SIZE + 1):
+            numbers.parse_pattern("'%d' #,##0" % idx)
+        self.assertTrue(len(numbers._pattern_cache) <=
+                        numbers._PATTERN_CACHE_SIZE)
+
+
+class NumberFormatterTestCase(unittest.TestCase):
+
+    def test_same_as_format_functions(self):
+        formatter = numbers.NumberFormatter('sv_SE', '#,##0.###;(#)')
+        for value in (0, 1, -1, 1234.5678, -1234.5678, Decimal('0.0005'),
+                      10 ** 12):
+            self.assertEqual(numbers.format_decimal(value, '#,##0.###;(#)',
+                                                    locale='sv_SE'),
+                             formatter.format(value))
+
+    def test_symbols_resolved_once(self):
+        formatter = numbers.NumberFormatter('de_CH', '#,##0.0')
+        formatter.symbols = dict(formatter.symbols, group='g', decimal='d')
+        self.assertEqual('1g234d5', formatter.format(1234.5))
+
+    def test_currency(self):
+        formatter = numbers.NumberFormatter('en_US', '\xa4\xa4 #,##0.00',
+                                            currency='usd')
+        self.assertEqual('USD 1,099.98', formatter.format(1099.98))
+        self.assertEqual('-USD 0.50', formatter.format(-0.5))
+
+    def test_apply_reuses_formatter(self):
+        locale = Locale.parse('de_DE')
+        pattern = numbers.parse_pattern('#,##0.###')
+        self.assertEqual('1.234,5', pattern.apply(1234.5, locale))
+        formatter = numbers._number_formatters[(locale, pattern, None)]
+        self.assertEqual('-7', pattern.apply(-7, 'de_DE'))
+        self.assertTrue(numbers._number_formatters[(locale, pattern, None)]
+                        is formatter)
+        self.assertEqual(dict, type(formatter.symbols))
+
+
+class FormatCurrencyTestCase(unittest.TestCase):
+
+    def test_currency_digits(self):
+        self.assertEqual('\xa51,100',
+                         numbers.format_currency(1099.98, 'JPY',
+                                                 locale='en_US'))
+        self.assertEqual('BHD 1,099.980',
+                         numbers.format_currency(1099.98, 'BHD',
+                                                 '\xa4\xa4 #,##0.00',
+                                                 locale='en_US'))
+        self.assertEqual('\xa51,099.98',
+                         numbers.format_currency(1099.98, 'JPY',
+                                                 locale='en_US',
+                                                 currency_digits=False))
+
+    def test_currency_digits_explicit_pattern(self):
+        self.assertEqual('JPY 1,100',
+                         numbers.format_currency(1099.98, 'JPY',
+                                                 '\xa4\xa4 #,##0.00',
+                                                 locale='en_US'))
+        # the shared parsed pattern is left alone
+        self.assertEqual((2, 2),
+                         numbers.parse_pattern('\xa4\xa4 #,##0.00').frac_prec)
+
+    def test_unknown_currency(self):
+        self.assertEqual(2, numbers.get_currency_precision('XYZ'))
+        self.assertEqual('XYZ1.50',
+                         numbers.format_currency(1.5, 'XYZ', locale='en_US'))
+
+    def test_formatter_cached(self):
+        numbers.format_currency(1, 'EUR', locale='de_DE')
+        locale = Locale.parse('de_DE')
+        formatter = numbers._currency_formatters[(locale, 'EUR', None, True)]
+        self.assertEqual('1,00\xa0\u20ac', formatter.format(1))
+        numbers.format_currency(2, 'EUR', locale=locale)
+        self.assertTrue(numbers._currency_formatters[
+            (locale, 'EUR', None, True)] is formatter)
+
+
+class FormatManyTestCase(unittest.TestCase):
+
+    def test_same_as_single(self):
+        values = [0, 7, -7, 0.5, 1.5, 2.5, 1234567.891, Decimal('-0.0049'),
+                  10 ** 15]
+        self.assertEqual([numbers.format_decimal(value, locale='fr_FR')
+                          for value in values],
+                         numbers.format_decimal_many(values, locale='fr_FR'))
+        self.assertEqual([numbers.format_currency(value, 'JPY', locale='ja_JP')
+                          for value in values],
+                         numbers.format_currency_many(values, 'JPY',
+                                                      locale='ja_JP'))
+        self.assertEqual([numbers.format_percent(value, locale='de_DE')
+                          for value in values],
+                         numbers.format_percent_many(values, locale='de_DE'))
+
+    def test_arrays(self):
+        from array import array
+        self.assertEqual(['1,5', '-2', '1\xa0000'],
+                         numbers.format_decimal_many(array(str('d'),
+                                                           [1.5, -2, 1000]),
+                                                     locale='sv_SE'))
+        self.assertEqual(['12,345'],
+                         numbers.format_decimal_many(array(str('l'), [12345]),
+                                                     locale='en_US'))
+        self.assertEqual([], numbers.format_decimal_many(iter([]),
+                                                         locale='en_US'))
+
+
+class NumberParserTestCase(unittest.TestCase):
+
+    def test_grouping(self):
+        parser = numbers.NumberParser('en_US')
+        self.assertEqual(Decimal('1234567.5'), parser.parse('1,234,567.5'))
+        self.assertEqual(Decimal('1234567'), parser.parse('1234567'))
+        for string in ('1,23,456', '12,3456', ',123', '1,234.', '1.2.3', ''):
+            self.assertRaises(numbers.NumberFormatError, parser.parse, string)
+        parser = numbers.NumberParser('hi_IN')
+        self.assertEqual(Decimal('1234567'), parser.parse('12,34,567'))
+        self.assertRaises(numbers.NumberFormatError, parser.parse,
+                          '1,234,567')
+
+    def test_round_trip(self):
+        values = [Decimal('0'), Decimal('-1099.98'), Decimal('1234567.25')]
+        for locale in ('en_US', 'de_DE', 'sv_SE', 'fr_FR'):
+            parser = numbers.NumberParser(locale)
+            for value in values:
+                for text in (numbers.format_decimal(value, locale=locale),
+                             numbers.format_currency(value, 'EUR',
+                                                     locale=locale)):
+                    self.assertEqual(value, parser.parse(text))
+            self.assertEqual(Decimal('-0.25'), parser.parse(
+                numbers.format_percent(-0.25, locale=locale)))
+        # the percent sign comes first in Turkish, and the Arabic patterns
+        # use an ASCII percent sign instead of the one of the locale
+        for locale in ('tr_TR', 'ar_EG'):
+            parser = numbers.NumberParser(locale)
+            for value in (Decimal('0.25'), Decimal('-0.25'),
+                          Decimal('12.34')):
+                self.assertEqual(value, parser.parse(
+                    numbers.format_percent(value, locale=locale)))
+
+    def test_percent_sign_position(self):
+        parser = numbers.NumberParser('tr_TR')
+        self.assertEqual(Decimal('0.25'), parser.parse('%25'))
+        self.assertEqual(Decimal('0.25'), parser.parse('%\xa025'))
+        self.assertEqual(Decimal('0.25'), parser.parse('25%'))
+        self.assertEqual(Decimal('-0.25'), parser.parse('-%25'))
+        self.assertRaises(numbers.NumberFormatError, parser.parse, '%25%')
+        parser = numbers.NumberParser('ar_EG')
+        self.assertEqual(Decimal('0.25'), parser.parse('25%'))
+        self.assertEqual(Decimal('0.25'), parser.parse('25\u066a'))
+
+    def test_signs(self):
+        parser = numbers.NumberParser('sv_SE')
+        self.assertEqual(Decimal('-1000'), parser.parse('\u22121\xa0000'))
+        self.assertEqual(Decimal('1000'), parser.parse('+1000'))
+        self.assertRaises(numbers.NumberFormatError, parser.parse, '--1')
+        self.assertRaises(numbers.NumberFormatError, parser.parse, '(1')
+        self.assertRaises(numbers.NumberFormatError, parser.parse, '(-5)')
+        self.assertRaises(numbers.NumberFormatError, parser.parse, '(+5)')
+
+    def test_affixes(self):
+        parser = numbers.NumberParser('en_US')
+        self.assertEqual(Decimal('5'), parser.parse('$5'))
+        self.assertEqual(Decimal('5'), parser.parse('USD 5'))
+        self.assertEqual(Decimal('5'), parser.parse('5 EUR'))
+        self.assertEqual(Decimal('-5'), parser.parse('($5)'))
+        for string in ('$5$', 'ABC 5', '5 ABC', '€5 USD', 'USD 5 EUR',
+                       '$5%', '%5$', '5%%', 'usd 5'):
+            self.assertRaises(numbers.NumberFormatError, parser.parse, string)
+        parser = numbers.NumberParser('de_DE')
+        self.assertEqual(Decimal('5'), parser.parse('5 €'))
+        for string in ('€5 €', '5 € %', '5 XYZ'):
+            self.assertRaises(numbers.NumberFormatError, parser.parse, string)
+
+    def test_stream(self):
+        from io import StringIO
+        parser = numbers.NumberParser('de_DE')
+        lines = StringIO('1.000,5\n\n-2\n')
+        self.assertEqual([Decimal('1000.5'), Decimal('-2')],
+                         list(parser.stream(lines)))
+        self.assertRaises(numbers.NumberFormatError, list,
+                          parser.stream(['1', 'x']))
+
+
+class FormatCompactDecimalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.data = Locale('en')._data
+        self.data['compact_decimal_formats'] = {
+            'short': {
+                '1000': {'one': '0K', 'other': '0K'},
+                '10000': {'other': '00K'},
+                '100000': {'other': '000K'},
+                '1000000': {'other': '0M'}
+            },
+            'long': {
+                '1000': {'other': "0 'thousand'"},
+                '10000': {'other': "00 'thousand'"}
+            },
+            'plural': {
+                '1000': {'one': "0 'thousand'", 'other': "0 'thousands'"},
+                '1000000': {'one': "0 'million'", 'other': "0 'millions'"}
+            }
+        }
+        self.data['plural_form'] = PluralRule({'one': 'n is 1'})
+
+    def tearDown(self):
+        del self.data['compact_decimal_formats']
+        del self.data['plural_form']
+        numbers._compact_tables.clear()
+
+    def test_short(self):
+        self.assertEqual('999', numbers.format_compact_decimal(999,
+                                                               locale='en'))
+        self.assertEqual('1K', numbers.format_compact_decimal(1234,
+                                                              locale='en'))
+        self.assertEqual('-1.2K', numbers.format_compact_decimal(
+            -1234, fraction_digits=1, locale='en'))
+        self.assertEqual('123.5K', numbers.format_compact_decimal(
+            123456, fraction_digits=1, locale='en'))
+        self.assertEqual('2,500M', numbers.format_compact_decimal(2.5e9,
+                                                                  locale='en'))
+
+    def test_round_to_next_magnitude(self):
+        self.assertEqual('1M', numbers.format_compact_decimal(999999,
+                                                              locale='en'))
+        self.assertEqual('999.5K', numbers.format_compact_decimal(
+            999500, fraction_digits=1, locale='en'))
+        self.assertEqual('1K', numbers.format_compact_decimal(999.5,
+                                                              locale='en'))
+        self.assertEqual('-1K', numbers.format_compact_decimal(-999.5,
+                                                               locale='en'))
+        self.assertEqual('999', numbers.format_compact_decimal(999.4,
+                                                               locale='en'))
+        self.assertEqual('999.5', numbers.format_compact_decimal(
+            999.5, fraction_digits=1, locale='en'))
+
+    def test_long(self):
+        self.assertEqual('12 thousand', numbers.format_compact_decimal(
+            12345, format_type='long', locale='en'))
+
+    def test_plural_of_displayed_value(self):
+        def format(number, fraction_digits=0):
+            return numbers.format_compact_decimal(
+                number, format_type='plural', fraction_digits=fraction_digits,
+                locale='en')
+        self.assertEqual('1 thousand', format(1234))
+        self.assertEqual('1.2 thousands', format(1234, fraction_digits=1))
+        self.assertEqual('2 thousands', format(1500))
+        self.assertEqual('-1 thousand', format(-1499))
+        self.assertEqual('1 million', format(999999))
+        self.assertEqual('1 million', format(1200000))
+        self.assertEqual('1 million', format(999999.5, fraction_digits=1))
+
+    def test_no_compact_formats(self):
+        self.assertEqual('12,345.7', numbers.format_compact_decimal(
+            12345.67, fraction_digits=1, locale='en_US'))
+
 
 def suite():
     suite = unittest.TestSuite()
@@ -163,6 +495,12 @@ def suite():
     suite.addTest(unittest.makeSuite(FormatDecimalTestCase))
     suite.addTest(unittest.makeSuite(FormatNumberTestCase))
     suite.addTest(unittest.makeSuite(BankersRoundTestCase))
+    suite.addTest(unittest.makeSuite(ParsePatternTestCase))
+    suite.addTest(unittest.makeSuite(NumberFormatterTestCase))
+    suite.addTest(unittest.makeSuite(FormatCurrencyTestCase))
+    suite.addTest(unittest.makeSuite(FormatManyTestCase))
+    suite.addTest(unittest.makeSuite(NumberParserTestCase))
+    suite.addTest(unittest.makeSuite(FormatCompactDecimalTestCase))
     return suite
 
 if __name__ == '__main__':
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2007-2011 Edgewall Software
+# All rights reserved.
+#
+# This software is licensed as described in the file COPYING, which
+# you should have received as part of this distribution. The terms
+# are also available at http://babel.edgewall.org/wiki/License.
+#
+# This software consists of voluntary contributions made by many
+# individuals. For the exact contribution history, see the revision
+# history and logs, available at http://babel.edgewall.org/log/.
+
+"""Time the formatting of numbers with an increasing number of digits.
+
+The time per digit should stay roughly constant as the numbers get longer;
+if it grows with the number of digits, the formatting is not linear.
+
+Then time single `format_decimal` calls with an integer, which should be
+faster than with the same value as a `Decimal`, as integers need no
+rounding. With the ``--baseline`` option, the time of the integer call is
+also compared with the given time, e.g. measured with an older version, and
+the script exits with an error if it is slower.
+"""
+
+from decimal import Decimal
+from optparse import OptionParser
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(sys.argv[0]), '..'))
+
+from babel.core import Locale
+from babel.numbers import format_decimal, NumberFormatter
+
+
+def main():
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('-l', '--locale', dest='locale',
+                      help='locale to format the numbers for '
+                           '(default "%default")')
+    parser.add_option('-p', '--pattern', dest='pattern',
+                      help='number format pattern (default "%default")')
+    parser.add_option('-n', '--number', dest='number', type='int',
+                      help='number of times each number is formatted '
+                           '(default %default)')
+    parser.add_option('-b', '--baseline', dest='baseline', type='float',
+                      help='time of format_decimal() with an integer to '
+                           'compare with, in microseconds per call')
+    parser.set_defaults(locale='en_US', pattern='#,##0.00', number=100)
+    options, args = parser.parse_args()
+    if args:
+        parser.error('incorrect number of arguments')
+
+    formatter = NumberFormatter(options.locale, options.pattern)
+    sys.stdout.write('%8s %12s %14s\n' % ('digits', 'total (ms)',
+                                          'per digit (us)'))
+    for digits in (10, 100, 1000, 10000, 100000):
+        value = Decimal('7' * digits + '.25')
+        seconds = min(timeit.repeat(lambda: formatter.format(value),
+                                    repeat=3, number=options.number))
+        seconds /= options.number
+        sys.stdout.write('%8d %12.3f %14.4f\n' % (digits, seconds * 1e3,
+                                                  seconds * 1e6 / digits))
+
+    locale = Locale.parse(options.locale)
+    number = options.number * 100
+    sys.stdout.write('\n%-24s %14s\n' % ('format_decimal()', 'per call (us)'))
+    times = {}
+    for name, value in (('int', 123456789), ('Decimal', Decimal(123456789))):
+        seconds = min(timeit.repeat(lambda: format_decimal(value,
+                                                           locale=locale),
+                                    repeat=3, number=number))
+        times[name] = seconds * 1e6 / number
+        sys.stdout.write('%-24s %14.2f\n' % (name, times[name]))
+    if options.baseline:
+        ratio = times['int'] / options.baseline
+        sys.stdout.write('%-24s %14.2f (%.2fx)\n' % ('baseline',
+                                                     options.baseline, ratio))
+        if ratio > 1:
+            sys.exit('format_decimal() with an integer is slower than the '
+                     'baseline')
+
+
+if __name__ == '__main__':
+    main()
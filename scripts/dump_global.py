@@ -12,22 +12,12 @@
 # individuals. For the exact contribution history, see the revision
 # history and logs, available at http://babel.edgewall.org/log/.
 
-import os
 from pprint import pprint
 import sys
 
-import babel
-from babel.compat import pickle
-
-dirname = os.path.join(os.path.dirname(babel.__file__))
-filename = os.path.join(dirname, 'global.dat')
-fileobj = open(filename, 'rb')
-try:
-    data = pickle.load(fileobj)
-finally:
-    fileobj.close()
+from babel.core import _read_global, get_global
 
 if len(sys.argv) > 1:
-    pprint(data.get(sys.argv[1]))
+    pprint(get_global(sys.argv[1]))
 else:
-    pprint(data)
+    pprint(dict(_read_global().items()))
@@ -14,6 +14,7 @@
 
 from __future__ import unicode_literals
 
+from copy import deepcopy
 from optparse import OptionParser
 import os
 import re
@@ -26,7 +27,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(sys.argv[0]), '..'))
 from babel import dates, numbers
 from babel.compat import pickle, text_type
 from babel.plural import PluralRule
-from babel.localedata import Alias
+from babel.localedata import Alias, dump_sectioned, flatten, merge
 
 parse = ElementTree.parse
 weekdays = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5,
@@ -69,8 +70,52 @@ def _translate_alias(ctxt, path):
     return keys
 
 
+def _write_locale_data(destdir, stem, data, formats):
+    """Write the data files of a locale, and return a dictionary mapping the
+    extension of every file written to its size.
+    """
+    sizes = {}
+    if formats in ('pickle', 'both'):
+        filename = os.path.join(destdir, 'localedata', stem + '.dat')
+        outfile = open(filename, 'wb')
+        try:
+            pickle.dump(data, outfile, 2)
+        finally:
+            outfile.close()
+        sizes['.dat'] = os.path.getsize(filename)
+    if formats in ('mmap', 'both'):
+        filename = os.path.join(destdir, 'localedata', stem + '.mdat')
+        outfile = open(filename, 'wb')
+        try:
+            dump_sectioned(data, outfile)
+        finally:
+            outfile.close()
+        sizes['.mdat'] = os.path.getsize(filename)
+    return sizes
+
+
+def _parent_locale(stem):
+    if stem == 'root':
+        return None
+    parts = stem.split('_')
+    if len(parts) == 1:
+        return 'root'
+    return '_'.join(parts[:-1])
+
+
 def main():
     parser = OptionParser(usage='%prog path/to/cldr')
+    parser.add_option('-f', '--format', dest='format', type='choice',
+                      choices=['pickle', 'mmap', 'both'],
+                      help='format of the locale data files to write: '
+                           '"pickle" (.dat, read by the "pickle" backend), '
+                           '"mmap" (sectioned .mdat files, read one '
+                           'top-level key at a time by the "sections" and '
+                           '"mmap" backends), or "both" (default "%default")')
+    parser.add_option('--flatten', dest='flatten', action='store_true',
+                      help='write the data of every locale merged with the '
+                           'data it inherits, with all aliases resolved')
+    parser.set_defaults(format='both', flatten=False)
     options, args = parser.parse_args()
     if len(args) != 1:
         parser.error('incorrect number of arguments')
@@ -103,9 +148,19 @@ def main():
             if 'to' not in child.attrib: # FIXME: support old mappings
                 meta_zones[elem.attrib['type']] = child.attrib['mzone']
 
+    # Import the number of fraction digits of currencies
+    currency_fractions = global_data.setdefault('currency_fractions', {})
+    for elem in sup.findall('.//currencyData/fractions/info'):
+        currency_fractions[elem.attrib['iso4217']] = (
+            int(elem.attrib['digits']), int(elem.attrib['rounding'])
+        )
+
     outfile = open(os.path.join(destdir, 'global.dat'), 'wb')
     try:
-        pickle.dump(global_data, outfile, 2)
+        if options.format == 'pickle':
+            pickle.dump(global_data, outfile, 2)
+        else:
+            dump_sectioned(global_data, outfile)
     finally:
         outfile.close()
 
@@ -140,6 +195,15 @@ def main():
     filenames.sort(key=lambda a: len(a))
     filenames.insert(0, 'root.xml')
 
+    # index of the generated data files, so that babel.localedata does not
+    # have to probe the file system to find out which locales are available
+    index = {'parents': {}, 'files': {}, 'flat': options.flatten}
+
+    # the data of every locale merged with the data it inherits, with the
+    # aliases left in place, so that they resolve against the data of the
+    # locales inheriting them
+    merged_data = {}
+
     for filename in filenames:
         stem, ext = os.path.splitext(filename)
         if ext != '.xml':
@@ -421,12 +485,32 @@ def main():
             number_symbols[elem.tag] = text_type(elem.text)
 
         decimal_formats = data.setdefault('decimal_formats', {})
+        compact_decimal_formats = data.setdefault('compact_decimal_formats',
+                                                  {})
         for elem in tree.findall('.//decimalFormats/decimalFormatLength'):
             if ('draft' in elem.attrib or 'alt' in elem.attrib) \
                     and elem.attrib.get('type') in decimal_formats:
                 continue
-            pattern = text_type(elem.findtext('decimalFormat/pattern'))
-            decimal_formats[elem.attrib.get('type')] = numbers.parse_pattern(pattern)
+            patterns = elem.findall('decimalFormat/pattern')
+            # patterns with a type are compact number patterns for numbers of
+            # the magnitude given by the type
+            compact = [pattern for pattern in patterns
+                       if 'type' in pattern.attrib]
+            patterns = [pattern for pattern in patterns
+                        if 'type' not in pattern.attrib]
+            if patterns:
+                pattern = text_type(patterns[0].text)
+                decimal_formats[elem.attrib.get('type')] = \
+                        numbers.parse_pattern(pattern)
+            for pattern in compact:
+                magnitudes = compact_decimal_formats.setdefault(
+                    elem.attrib.get('type'), {})
+                counts = magnitudes.setdefault(pattern.attrib['type'], {})
+                count = pattern.attrib.get('count', 'other')
+                if ('draft' in pattern.attrib or 'alt' in pattern.attrib) \
+                        and count in counts:
+                    continue
+                counts[count] = text_type(pattern.text)
 
         scientific_formats = data.setdefault('scientific_formats', {})
         for elem in tree.findall('.//scientificFormats/scientificFormatLength'):
@@ -478,11 +562,25 @@ def main():
                 unit_patterns[unit_type][pattern.attrib['count']] = \
                         text_type(pattern.text)
 
-        outfile = open(os.path.join(destdir, 'localedata', stem + '.dat'), 'wb')
-        try:
-            pickle.dump(data, outfile, 2)
-        finally:
-            outfile.close()
+        parent = _parent_locale(stem)
+        if options.flatten:
+            if parent is not None:
+                merged = deepcopy(merged_data[parent])
+                merge(merged, data)
+                data = merged
+            merged_data[stem] = data
+            data = flatten(data)
+
+        sizes = _write_locale_data(destdir, stem, data, options.format)
+        index['parents'][stem] = parent
+        for extension, size in sizes.items():
+            index['files'].setdefault(extension, {})[stem] = size
+
+    outfile = open(os.path.join(destdir, 'localedata', 'index.idx'), 'wb')
+    try:
+        pickle.dump(index, outfile, 2)
+    finally:
+        outfile.close()
 
 
 if __name__ == '__main__':
@@ -87,7 +87,9 @@ setup(
         'Topic :: Software Development :: Libraries :: Python Modules',
     ],
     packages = ['babel', 'babel.messages'],
-    package_data = {'babel': ['global.dat', 'localedata/*.dat']},
+    package_data = {'babel': ['global.dat', 'localedata/*.dat',
+                              'localedata/*.mdat',
+                              'localedata/index.idx']},
 
     cmdclass = {'build_doc': build_doc, 'test_doc': test_doc},
 